@@ -0,0 +1,66 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Env.get_value for each cast kind."""
+
+import json
+
+import environ
+
+ENVIRON = {
+    'STR': 'not-so-secret',
+    'BOOL': 'on',
+    'INT': '8000',
+    'FLOAT': '2.5',
+    'JSON': json.dumps({'one': 'bar', 'two': 2, 'three': 33.44}),
+    'LIST': 'example.com,www.example.com,api.example.com',
+    'INTS': '42,33,7',
+    'TUPLE': '(42,33)',
+    'DICT': 'foo=bar,test=on',
+    'URL': 'https://www.example.com/path?query=1',
+    'PATH': '/home/dev',
+    'PROXIED': '$STR',
+}
+
+
+def _env(cache_values=False, versioned=False):
+    env = environ.Env()
+    env.ENVIRON = environ.VersionedMapping(ENVIRON) if versioned else ENVIRON
+    env.cache_values = cache_values
+    return env
+
+
+def cases():
+    # Cached hits cost less than uncached lookups when the environment tells
+    # whether it changed (versioned, snapshot); with a plain mapping they
+    # check the raw value, which only pays off for costly casts.
+    result = []
+    for prefix, env in (('get_value', _env()),
+                        ('get_value.cached', _env(cache_values=True)),
+                        ('get_value.versioned',
+                         _env(cache_values=True, versioned=True)),
+                        ('get_value.snapshot', _env().snapshot())):
+        result.extend([
+            (f'{prefix}.str', lambda env=env: env.str('STR'), 100000),
+            (f'{prefix}.bool', lambda env=env: env.bool('BOOL'), 100000),
+            (f'{prefix}.int', lambda env=env: env.int('INT'), 100000),
+            (f'{prefix}.float', lambda env=env: env.float('FLOAT'), 100000),
+            (f'{prefix}.json', lambda env=env: env.json('JSON'), 50000),
+            (f'{prefix}.list', lambda env=env: env.list('LIST'), 100000),
+            (f'{prefix}.list_int',
+             lambda env=env: env.list('INTS', cast=int), 100000),
+            (f'{prefix}.tuple', lambda env=env: env.tuple('TUPLE'), 100000),
+            (f'{prefix}.dict', lambda env=env: env.dict('DICT'), 100000),
+            (f'{prefix}.url', lambda env=env: env.url('URL'), 50000),
+            (f'{prefix}.path', lambda env=env: env.path('PATH'), 50000),
+            (f'{prefix}.proxied', lambda env=env: env('PROXIED'), 100000),
+            (f'{prefix}.default',
+             lambda env=env: env.int('MISSING', default=1), 100000),
+        ])
+    return result
@@ -0,0 +1,31 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""FileAwareMapping lookups with and without the file cache."""
+
+import atexit
+import os
+import tempfile
+
+import environ
+
+
+def cases():
+    with tempfile.NamedTemporaryFile('w', delete=False) as f:
+        f.write('not-so-secret')
+    atexit.register(os.unlink, f.name)
+
+    data = {'SECRET_KEY_FILE': f.name, 'DEBUG': 'on'}
+    cached = environ.FileAwareMapping(env=dict(data))
+    uncached = environ.FileAwareMapping(env=dict(data), cache=False)
+    return [
+        ('fileaware.cached', lambda: cached['SECRET_KEY'], 100000),
+        ('fileaware.uncached', lambda: uncached['SECRET_KEY'], 10000),
+        ('fileaware.plain', lambda: cached['DEBUG'], 100000),
+    ]
@@ -0,0 +1,31 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Float casting over a corpus of typical float settings."""
+
+import environ
+
+CORPUS = {
+    'fraction': '0.5',
+    'integer': '30',
+    'negative': '-1.0',
+    'small': '0.001',
+    'decimal_comma': '33,3',
+    'thousands': '123,420,333.3',
+    'thousands_locale': '123.420.333,3',
+}
+
+
+def cases():
+    parse_value = environ.Env.parse_value
+    return [
+        (f'float.{name}', lambda value=value: parse_value(value, float),
+         100000)
+        for name, value in CORPUS.items()
+    ]
@@ -0,0 +1,34 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Env.parse_value for list, dict and nested dict specs."""
+
+import environ
+
+NESTED_SPEC = {
+    'value': int,
+    'cast': {'b': [float], 'c': bool},
+}
+
+
+def cases():
+    parse_value = environ.Env.parse_value
+    return [
+        ('parse_value.list', lambda: parse_value('a,b,c,d', list), 100000),
+        ('parse_value.list_int',
+         lambda: parse_value('1,2,3,4', [int]), 100000),
+        ('parse_value.tuple_int',
+         lambda: parse_value('(1,2,3,4)', (int,)), 100000),
+        ('parse_value.dict',
+         lambda: parse_value('a=1,b=2,c=3', dict), 100000),
+        ('parse_value.dict_spec',
+         lambda: parse_value('a=1;b=2;c=3', {'value': int}), 100000),
+        ('parse_value.nested_dict_spec',
+         lambda: parse_value('a=1;b=1.1,2.2;c=on', NESTED_SPEC), 100000),
+    ]
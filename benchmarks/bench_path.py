@@ -0,0 +1,22 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Path joins."""
+
+import environ
+
+
+def cases():
+    root = environ.Path('/home/dev/project')
+    return [
+        ('path.call', lambda: root('static', 'css'), 100000),
+        ('path.path', lambda: root.path('media'), 100000),
+        ('path.add', lambda: root + 'templates', 100000),
+        ('path.parent', lambda: root - 1, 100000),
+    ]
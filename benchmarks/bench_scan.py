@@ -0,0 +1,27 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Env.scan() over an environment of 5000 variables."""
+
+import environ
+
+ENVIRON = {f'SERVICE_{i}_HOST': f'10.0.{i // 256}.{i % 256}'
+           for i in range(5000)}
+ENVIRON.update({f'FEATURE_{i}': 'on' for i in range(10)})
+
+
+def cases():
+    indexed = environ.Env()
+    indexed.ENVIRON = environ.VersionedMapping(dict(ENVIRON))
+    scanned = environ.Env()
+    scanned.ENVIRON = dict(ENVIRON)
+    return [
+        ('scan.indexed', lambda: indexed.scan('FEATURE_'), 2000),
+        ('scan.linear', lambda: scanned.scan('FEATURE_'), 200),
+    ]
@@ -0,0 +1,36 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Per-lookup cost of variables declared in the Env scheme."""
+
+import environ
+
+ENVIRON = {
+    'SECRET_KEY': 'not-so-secret',
+    'DEBUG': 'on',
+    'PORT': '8000',
+    'ALLOWED_HOSTS': 'example.com,www.example.com',
+}
+
+SCHEME = {
+    'SECRET_KEY': str,
+    'DEBUG': bool,
+    'PORT': (int, 80),
+    'ALLOWED_HOSTS': ([str], []),
+    'TIMEOUT': (float, 2.5),
+}
+
+
+def cases():
+    env = environ.Env(**SCHEME)
+    env.ENVIRON = ENVIRON
+    return [
+        (f'scheme.{var}', lambda var=var: env(var), 100000)
+        for var in SCHEME
+    ]
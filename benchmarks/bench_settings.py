@@ -0,0 +1,67 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Resolving a whole set of settings: Env.load() against Settings.load()."""
+
+import typing
+
+import environ
+from environ.environ import _LOADERS
+
+ENVIRON = {
+    'SECRET_KEY': 'not-so-secret',
+    'DEBUG': 'on',
+    'PORT': '8000',
+    'ALLOWED_HOSTS': 'example.com,www.example.com',
+    'WORKERS': '4',
+    'RATIO': '0.5',
+    'ADMINS': 'alice,bob',
+}
+
+SPEC = {
+    'SECRET_KEY': str,
+    'DEBUG': (bool, False),
+    'PORT': (int, 80),
+    'ALLOWED_HOSTS': ([str], []),
+    'TIMEOUT': (float, 2.5),
+    'WORKERS': (int, 1),
+    'RATIO': (float, 1.0),
+    'ADMINS': ([str], []),
+    'LOG_LEVEL': (str, 'INFO'),
+    'USE_TLS': (bool, False),
+}
+
+
+class AppSettings(environ.Settings):
+    SECRET_KEY: str
+    DEBUG: bool = False
+    PORT: int = 80
+    ALLOWED_HOSTS: typing.List[str] = []
+    TIMEOUT: float = 2.5
+    WORKERS: int = 1
+    RATIO: float = 1.0
+    ADMINS: typing.List[str] = []
+    LOG_LEVEL: str = 'INFO'
+    USE_TLS: bool = False
+
+
+def load_cold(env):
+    # The first load of a process, which builds the loader.
+    _LOADERS.clear()
+    return AppSettings.load(env)
+
+
+def cases():
+    env = environ.Env()
+    env.ENVIRON = ENVIRON
+    return [
+        ('load.env_load', lambda: env.load(SPEC), 20000),
+        ('load.settings', lambda: AppSettings.load(env), 20000),
+        ('load.settings_cold', lambda: load_cold(env), 2000),
+    ]
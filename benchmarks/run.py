@@ -0,0 +1,138 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Run the benchmark suite of the config hot paths.
+
+Each ``bench_*.py`` module of this directory defines ``cases()``, returning
+``(name, func, number)`` tuples. Every case is timed with :py:mod:`timeit`
+and the best of ``--repeat`` runs is reported in nanoseconds per call.
+
+Usage::
+
+    # print results as JSON
+    python benchmarks/run.py
+
+    # store a new baseline
+    python benchmarks/run.py --output benchmarks/baseline.json
+
+    # fail if a case is more than 25% slower than the baseline
+    python benchmarks/run.py --compare benchmarks/baseline.json
+
+Baselines are only comparable on the machine they were recorded on.
+"""
+
+import argparse
+import fnmatch
+import importlib
+import json
+import os
+import platform
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODULES = [
+    'bench_env',
+    'bench_scheme',
+    'bench_scan',
+    'bench_settings',
+    'bench_float',
+    'bench_parse',
+    'bench_read_env',
+    'bench_urls',
+    'bench_fileaware',
+    'bench_path',
+]
+
+
+def collect(pattern):
+    """Yield the ``(name, func, number)`` cases matching ``pattern``."""
+    # Benchmark the working tree rather than an installed release.
+    sys.path[:0] = [HERE, os.path.dirname(HERE)]
+    for module_name in MODULES:
+        module = importlib.import_module(module_name)
+        for name, func, number in module.cases():
+            if fnmatch.fnmatch(name, pattern):
+                yield name, func, number
+
+
+def run(pattern='*', repeat=5, scale=1.0):
+    """Time every case and return the results keyed by case name."""
+    results = {}
+    for name, func, number in collect(pattern):
+        number = max(1, int(number * scale))
+        seconds = min(timeit.repeat(func, number=number, repeat=repeat))
+        results[name] = {
+            'ns_per_op': round(seconds / number * 1e9, 1),
+            'number': number,
+        }
+        print(f'{name:<48}{results[name]["ns_per_op"]:>14.1f} ns',
+              file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return the cases more than ``threshold`` slower than ``baseline``."""
+    regressions = {}
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before = baseline[name]['ns_per_op']
+        ratio = result['ns_per_op'] / before if before else 1.0
+        if ratio > 1.0 + threshold:
+            regressions[name] = ratio
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('-k', '--filter', default='*',
+                        help='only run cases matching this glob pattern')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='number of timing runs per case (default: 5)')
+    parser.add_argument('--scale', type=float, default=1.0,
+                        help='multiply the number of calls per run')
+    parser.add_argument('-o', '--output',
+                        help='write the results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE',
+                        help='compare against a baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed slowdown ratio (default: 0.25)')
+    args = parser.parse_args(argv)
+
+    results = run(args.filter, args.repeat, args.scale)
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write('\n')
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.threshold)
+        for name, ratio in sorted(regressions.items()):
+            print(f'REGRESSION {name}: {ratio:.2f}x the baseline',
+                  file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
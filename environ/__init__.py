@@ -17,6 +17,8 @@ for details on the use of this package.
 """  # noqa: E501
 
 from .environ import *
+from .settings import Field, field, Settings
+from .watcher import EnvWatcher
 
 
 __copyright__ = 'Copyright (C) 2013-2026 Daniele Faraglia'
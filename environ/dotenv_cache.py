@@ -0,0 +1,144 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""On-disk cache of the variables parsed from .env files."""
+
+import codecs
+import hashlib
+import logging
+import marshal
+import os
+import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the parser or the format of the entries changes.
+FORMAT = 1
+# Files modified less than this many seconds before they were cached may be
+# modified again without their stat changing: their content is checked.
+_RACY_SECONDS = 2
+_READ_SIZE = 1 << 16
+
+
+def default_directory():
+    """Return the directory of the cache, in the user cache directory."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'django-environ')
+
+
+def _signature(stat):
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino, stat.st_dev
+
+
+def _hashed_chunks(f, digest, encoding):
+    """Yield the decoded content of the binary file ``f``, hashing it."""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for block in iter(lambda: f.read(_READ_SIZE), b''):
+        digest.update(block)
+        yield decoder.decode(block)
+    yield decoder.decode(b'', final=True)
+
+
+def _hash(f):
+    digest = hashlib.blake2b(digest_size=16)
+    for block in iter(lambda: f.read(_READ_SIZE), b''):
+        digest.update(block)
+    return digest.digest()
+
+
+class DotenvCache:
+    """
+    Variables parsed from .env files, stored next to each other in a
+    directory with one ``marshal`` file per .env file and parse options.
+
+    An entry is used while the path, modification time, size, inode and
+    device of the file are those it was stored with. Otherwise the content
+    of the file is hashed, and the entry is still used (and updated) if the
+    content did not change; the file is parsed again if it did.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = os.fspath(directory or default_directory())
+
+    def entry_path(self, path, options):
+        """Return the path of the entry of the .env file at ``path``."""
+        name = hashlib.blake2b(
+            repr((path, options)).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.directory, f'{name}.marshal')
+
+    def load(self, path, options, parse, encoding='utf8'):
+        """Return the variables of the .env file at ``path``.
+
+        :param path: The path of the file.
+        :param tuple options: Options ``parse`` depends on, part of the key.
+        :param parse: Callable parsing the file, given the decoded content
+            as an iterable of chunks, into a dict.
+        :param encoding: The encoding of the file.
+        :rtype: dict[str, str]
+        :raises OSError: If the file cannot be read.
+        """
+        path = os.path.realpath(path)
+        options = (FORMAT, marshal.version, encoding) + tuple(options)
+        entry_path = self.entry_path(path, options)
+        entry = self._read_entry(entry_path, path, options)
+
+        with open(path, 'rb') as f:
+            signature = _signature(os.fstat(f.fileno()))
+            if entry is not None:
+                if entry[0] == signature:
+                    return entry[2]
+                if entry[1] == _hash(f):
+                    self._write_entry(entry_path, (
+                        path, options, signature, entry[1], entry[2]))
+                    return entry[2]
+                f.seek(0)
+            digest = hashlib.blake2b(digest_size=16)
+            values = parse(_hashed_chunks(f, digest, encoding))
+
+        self._write_entry(entry_path, (
+            path, options, signature, digest.digest(), values))
+        return values
+
+    @staticmethod
+    def _read_entry(entry_path, path, options):
+        """Return the signature, hash and values of an entry, if valid."""
+        try:
+            with open(entry_path, 'rb') as f:
+                entry = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        if not (isinstance(entry, tuple) and len(entry) == 5
+                and entry[:2] == (path, options)
+                and isinstance(entry[4], dict)):
+            return None
+        return entry[2:]
+
+    def _write_entry(self, entry_path, entry):
+        """Store an entry atomically, logging failures."""
+        path, options, signature, digest, values = entry
+        if time.time_ns() - signature[0] < _RACY_SECONDS * 10 ** 9:
+            # The file may change again within the resolution of its
+            # modification time: make the next load check its content.
+            signature = None
+        data = marshal.dumps((path, options, signature, digest, values))
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=self.directory, prefix='.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, entry_path)
+            finally:
+                if os.path.lexists(tmp_path):
+                    os.unlink(tmp_path)
+        except OSError as exc:
+            logger.debug('Could not cache %s: %s', path, exc)
@@ -13,12 +13,18 @@ variables to configure your Django application.
 """
 
 import ast
+import bisect
+import contextvars
+import functools
 import itertools
 import logging
 import os
 import re
 import sys
 import warnings
+from collections import ChainMap, namedtuple
+from contextlib import contextmanager
+from types import MappingProxyType
 from typing import Dict, List, Tuple, Union
 from urllib.parse import (
     parse_qs,
@@ -38,10 +44,353 @@ from .compat import (
     REDIS_DRIVER,
 )
 from .fileaware_mapping import FileAwareMapping
+from .lazy import (  # noqa: F401
+    _tracking,
+    DependencyGraph,
+    LazyEnv,
+    LazyValue,
+    record,
+)
+from .versioned_mapping import _OS_ENVIRON, VersionedMapping  # noqa: F401
 
 OPENABLE = (str, os.PathLike)
 logger = logging.getLogger(__name__)
 
+_FLOAT_JUNK_RE = re.compile(r'[^\d,.-]')
+_FLOAT_SEPARATOR_RE = re.compile(r'[,.]')
+
+# Line boundaries of str.splitlines(), and any other character.
+_LINE_ENDINGS = tuple('\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029')
+_LINE_BREAK = r'\r\n|[\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]'
+_LINE_CHAR = r'[^\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]'
+# One line of a .env file: an assignment, or anything else, and its break.
+_ENV_LINE_RE = re.compile(
+    rf'(?:(?:export )?([A-Za-z_0-9]+)=({_LINE_CHAR}*)|({_LINE_CHAR}*))'
+    rf'(?:({_LINE_BREAK})|\Z)'
+)
+# Size of the blocks .env files are read in.
+_ENV_READ_SIZE = 1 << 16
+# A ${NAME}, ${NAME:-default} or ${NAME-default} reference, or an escaped $.
+_ENV_REFERENCE_RE = re.compile(
+    r'\$(?:\$|\{([A-Za-z_][A-Za-z_0-9]*)(?:(:?-)([^}]*))?\})')
+# Threads reading layered .env files.
+_ENV_READERS = 8
+# Proxy memos of the resolution passes of the current context, by id of Env.
+_resolution_passes = contextvars.ContextVar('resolution_passes', default=None)
+# Escaped characters of double-quoted values, except \r, \n and \t.
+_ENV_ESCAPE_RE = re.compile(r'\\([^rnt\n])')
+
+
+def _strip_comment(value):
+    """Remove an inline comment of a .env value, honoring single quotes.
+
+    Returns the value and whether it was single-quoted.
+    """
+    stripped = value.lstrip()
+    if stripped[:1] == "'":
+        # The closing quote is the last one followed by nothing but blanks
+        # and, optionally, a comment.
+        end = stripped.rfind("'")
+        while end > 0:
+            rest = stripped[end + 1:].lstrip()
+            if not rest or rest[0] == '#':
+                return stripped[1:end], True
+            end = stripped.rfind("'", 0, end)
+    comment = value.find('#')
+    if comment != -1:
+        value = value[:comment]
+    return value, False
+
+
+def _env_lines(chunks):
+    """Match the lines of the content of a .env file read in chunks.
+
+    Chunks may split the content anywhere: a line is matched once its line
+    break is read, so that no more than a chunk and a line are held.
+    """
+    rest = ''
+    for chunk in chunks:
+        if rest:
+            chunk = rest + chunk
+            rest = ''
+        end = len(chunk)
+        for match in _ENV_LINE_RE.finditer(chunk):
+            if match.end() == end and match.group(4) in (None, '\r'):
+                # An incomplete line, or a \r which may start a \r\n.
+                rest = chunk[match.start():]
+                break
+            yield match
+    if rest:
+        for match in _ENV_LINE_RE.finditer(rest):
+            if match.end() > match.start():
+                yield match
+
+
+def _env_chunks(env_file, encoding):
+    """Read a .env file, yielding its content in chunks.
+
+    ``env_file`` is a path, a file descriptor (left open), a file object
+    (closed when done) or an iterable of lines.
+    """
+    if isinstance(env_file, int):
+        with open(env_file, encoding=encoding, closefd=False) as f:
+            yield from iter(functools.partial(f.read, _ENV_READ_SIZE), '')
+    elif isinstance(env_file, OPENABLE):
+        # Python 3.5 support (wrap path with str).
+        with open(str(env_file), encoding=encoding) as f:
+            yield from iter(functools.partial(f.read, _ENV_READ_SIZE), '')
+    elif hasattr(env_file, 'read'):
+        with env_file as f:
+            yield from iter(functools.partial(f.read, _ENV_READ_SIZE), '')
+    else:
+        for line in env_file:
+            yield line if line.endswith(_LINE_ENDINGS) else line + '\n'
+
+
+def _tokenize_env(chunks, parse_comments=False):
+    """Split the content of a .env file into variables, in a single pass.
+
+    ``chunks`` is an iterable of consecutive pieces of the content. Yields
+    ``(key, value, quote, lineno)`` tuples, where ``quote`` is the quote
+    character the value was enclosed in (``"'"`` or ``'"'``) or an empty
+    string. Lines which are not assignments, comments or blank are logged
+    and skipped.
+    """
+    for lineno, match in enumerate(_env_lines(chunks), 1):
+        key, value, other, _ = match.groups()
+        if key is None:
+            if other and other[0] != '#':
+                logger.warning('Invalid line: %s', other)
+            continue
+
+        quote_char = ''
+        if parse_comments:
+            value, single = _strip_comment(value)
+            if single:
+                quote_char = "'"
+        elif len(value) > 1 and value[0] == value[-1] == "'":
+            value = value[1:-1]
+            quote_char = "'"
+
+        if len(value) > 1 and value[0] == value[-1] == '"':
+            value = value[1:-1]
+            quote_char = '"'
+            if '\\' in value:
+                # Keep escaped newline/tabs in quoted strings
+                value = _ENV_ESCAPE_RE.sub(r'\1', value)
+
+        yield key, value, quote_char, lineno
+
+
+def _parse_env_chunks(chunks, parse_comments=False):
+    """Return the variables of a .env file read in chunks, the last
+    assignment of a variable winning."""
+    return {key: value
+            for key, value, _, _ in _tokenize_env(chunks, parse_comments)}
+
+
+def _parse_env_templates(chunks, parse_comments=False):
+    """Return the variables of a .env file read in chunks as
+    ``(template, lineno)`` pairs, for :py:func:`_interpolate`.
+
+    Single-quoted values are literal: their ``$`` are escaped.
+    """
+    return {
+        key: (value.replace('$', '$$') if quote == "'" else value, lineno)
+        for key, value, quote, lineno in _tokenize_env(chunks, parse_comments)
+    }
+
+
+def _env_source(env_file):
+    """Return the name of a .env file for messages."""
+    if isinstance(env_file, OPENABLE):
+        return os.fspath(env_file)
+    return getattr(env_file, 'name', f'<{type(env_file).__name__}>')
+
+
+def _parse_env_file(env_file, parse_comments=False, encoding='utf8',
+                    cache=False, interpolate=False):
+    """Return the variables of a .env file, cached on disk if ``cache``.
+
+    With ``interpolate``, values are ``(template, location)`` pairs.
+    """
+    parse = _parse_env_templates if interpolate else _parse_env_chunks
+    if cache and isinstance(env_file, OPENABLE):
+        # Imported on first use, like the other modules only some reads
+        # need, to keep importing environ fast.
+        # pylint: disable-next=import-outside-toplevel
+        from .dotenv_cache import DotenvCache
+        dotenv_cache = DotenvCache(None if cache is True else cache)
+        values = dotenv_cache.load(
+            env_file, (parse_comments, interpolate),
+            functools.partial(parse, parse_comments=parse_comments),
+            encoding)
+    else:
+        values = parse(_env_chunks(env_file, encoding), parse_comments)
+    if interpolate:
+        source = _env_source(env_file)
+        values = {key: (template, f'{source}:{lineno}')
+                  for key, (template, lineno) in values.items()}
+    return values
+
+
+def _interpolate(entries, environ, external=()):
+    """Substitute the ``${NAME}`` references of .env variables.
+
+    :param dict entries: ``(template, location)`` pairs by variable name.
+    :param environ: Environment of the names the variables do not define,
+        and of the names in ``external``.
+    :param external: Names resolved from ``environ`` even if the variables
+        define them, e.g. variables that are already set and not
+        overwritten.
+    :returns: The values of the variables, resolved in dependency order.
+    :raises ImproperlyConfigured: If the references are circular.
+    """
+    def local(name):
+        return name in entries and name not in external
+
+    # Depth-first topological sort, without recursion for long chains.
+    order = []
+    state = {}
+    for root in entries:
+        if root in state:
+            continue
+        state[root] = False
+        stack = [(root, _env_references(entries[root][0]))]
+        while stack:
+            name, references = stack[-1]
+            for reference in references:
+                if reference == name or not local(reference):
+                    continue
+                if reference not in state:
+                    state[reference] = False
+                    stack.append(
+                        (reference, _env_references(entries[reference][0])))
+                    break
+                if state[reference] is False:
+                    names = [item[0] for item in stack]
+                    cycle = names[names.index(reference):] + [reference]
+                    raise ImproperlyConfigured(
+                        'Circular reference in .env files: ' + ' -> '.join(
+                            f'{item} ({entries[item][1]})' for item in cycle))
+            else:
+                state[name] = True
+                order.append(name)
+                stack.pop()
+
+    values = {}
+
+    def substitute(match):
+        name, operator_, default = match.groups()
+        if name is None:
+            return '$'  # $$
+        # A variable referencing itself, as in PORT=${PORT:-5432}, sees the
+        # value of the environment.
+        if name != variable and local(name):
+            value = values[name]
+        else:
+            value = environ.get(name)
+        if value is None or operator_ == ':-' and not value:
+            return default or ''
+        return value
+
+    for variable in order:
+        template = entries[variable][0]
+        values[variable] = _ENV_REFERENCE_RE.sub(substitute, template) \
+            if '$' in template else template
+    return {name: values[name] for name in entries}
+
+
+def _env_references(template):
+    """Return an iterator over the names referenced by a template."""
+    if '$' not in template:
+        return iter(())
+    return (match.group(1) for match in _ENV_REFERENCE_RE.finditer(template)
+            if match.group(1) is not None)
+
+
+@functools.lru_cache(maxsize=None)
+def _env_readers():
+    """Return the threads reading layered .env files, started on first use
+    and shared by later reads."""
+    # pylint: disable-next=import-outside-toplevel
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(
+        max_workers=_ENV_READERS, thread_name_prefix='environ-read_env')
+
+
+if hasattr(os, 'register_at_fork'):
+    # The threads of the parent process do not exist in a forked child.
+    os.register_at_fork(after_in_child=_env_readers.cache_clear)
+
+
+def _read_env_layers(layers, precedence, **options):
+    """Read .env files concurrently and merge their variables.
+
+    ``options`` are those of :py:func:`_parse_env_file`. Files which do not
+    exist or cannot be read are logged and skipped. Returns None if no file
+    could be read.
+    """
+    if precedence not in ('last', 'first'):
+        raise ValueError(
+            f"precedence must be 'last' or 'first', not {precedence!r}")
+
+    def read(layer):
+        try:
+            values = _parse_env_file(layer, **options)
+        except OSError:
+            logger.info(
+                "%s not found - if you're not configuring your "
+                "environment separately, check this.", layer)
+            return None
+        logger.debug('Read environment variables from: %s', layer)
+        return values
+
+    if len(layers) > 1:
+        results = list(_env_readers().map(read, layers))
+    else:
+        results = [read(layer) for layer in layers]
+
+    if all(values is None for values in results):
+        return None
+    merged = {}
+    for values in results if precedence == 'last' else reversed(results):
+        if values is not None:
+            merged.update(values)
+    return merged
+
+
+_FOUND_ENVS = {}
+"""Paths found by :py:meth:`Env.find_env`, keyed by start directory, file
+name and markers. Searches which found nothing are not remembered."""
+
+_FOUND_ENVS_MAXSIZE = 1024
+
+
+def _find_env(start, filename, markers):
+    """Return the path of the nearest ``filename`` in the absolute directory
+    ``start`` or one of its parents, up to the first directory containing
+    one of ``markers``."""
+    key = (start, filename, markers)
+    path = _FOUND_ENVS.get(key)
+    if path is not None:
+        return path
+    directory = start
+    while True:
+        path = os.path.join(directory, filename)
+        if os.path.exists(path):
+            break
+        parent = os.path.dirname(directory)
+        if parent == directory or any(
+                os.path.exists(os.path.join(directory, marker))
+                for marker in markers):
+            return None
+        directory = parent
+    if len(_FOUND_ENVS) >= _FOUND_ENVS_MAXSIZE:
+        _FOUND_ENVS.clear()
+    _FOUND_ENVS[key] = path
+    return path
+
 
 def _cast(value):
     # Safely evaluate an expression node or a string containing a Python
@@ -58,6 +407,11 @@ def _cast_int(v):
     return int(v) if hasattr(v, 'isdigit') and v.isdigit() else v
 
 
+def _strict_float(value):
+    """Return ``float(value)``, bypassing the lenient float parser."""
+    return float(value)
+
+
 def _cast_urlstr(v):
     return unquote(v) if isinstance(v, str) else v
 
@@ -66,18 +420,337 @@ def _urlparse_quote(url):
     return urlparse(quote(url, safe=':/?&=@'))
 
 
+def _freeze(obj):
+    """Return a hashable, type-tagged key for a cast spec or default.
+
+    Raises :py:exc:`TypeError` if ``obj`` (or one of its items) can not be
+    hashed.
+    """
+    if isinstance(obj, (list, tuple)):
+        return type(obj), tuple(_freeze(item) for item in obj)
+    if isinstance(obj, dict):
+        return dict, frozenset(
+            (_freeze(key), _freeze(value)) for key, value in obj.items()
+        )
+    hash(obj)
+    # Tag with the type so that e.g. ``True`` and ``1`` do not collide.
+    return type(obj), obj
+
+
+_SCALARS = frozenset((str, bytes, int, float, bool, type(None)))
+
+
+def _picklable(value):
+    """Return whether ``value`` can be pickled."""
+    import pickle  # pylint: disable=import-outside-toplevel
+    try:
+        pickle.dumps(value)
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return False
+    return True
+
+
+def _copy_if_mutable(value):
+    """Return a deep copy of mutable containers, ``value`` otherwise."""
+    # Cast results are trees of builtin containers, which this copies
+    # several times faster than copy.deepcopy().
+    if isinstance(value, list):
+        return [item if type(item) in _SCALARS else _copy_if_mutable(item)
+                for item in value]
+    if isinstance(value, dict):
+        return {key: item if type(item) in _SCALARS else _copy_if_mutable(item)
+                for key, item in value.items()}
+    if isinstance(value, (set, bytearray)):
+        return value.copy()
+    return value
+
+
+def _identity(value):
+    return value
+
+
+def _bool_parser(cls):
+    def parse_bool(value):
+        try:
+            return int(value) != 0
+        except ValueError:
+            return value.lower().strip() in cls.BOOLEAN_TRUE_STRINGS
+    return parse_bool
+
+
+def _dict_parser(_cls):
+    def parse_dict(value):
+        return dict([v.split('=', 1) for v in value.split(',') if v])
+    return parse_dict
+
+
+def _list_parser(_cls):
+    def parse_list(value):
+        return [x for x in value.split(',') if x]
+    return parse_list
+
+
+def _tuple_parser(_cls):
+    def parse_tuple(value):
+        val = value.strip('(').strip(')').split(',')
+        # pylint: disable=consider-using-generator
+        return tuple([x for x in val if x])
+    return parse_tuple
+
+
+def _float_parser(_cls):
+    def parse_float(value):
+        # fast path for well-formed values
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        # clean string
+        float_str = _FLOAT_JUNK_RE.sub('', value)
+        # split for avoid thousand separator and different
+        # locale comma/dot symbol
+        parts = _FLOAT_SEPARATOR_RE.split(float_str)
+        if len(parts) == 1:
+            float_str = parts[0]
+        else:
+            float_str = f"{''.join(parts[0:-1])}.{parts[-1]}"
+        return float(float_str)
+    return parse_float
+
+
+def _list_spec_parser(_cls, cast):
+    item_cast = cast[0]
+
+    def parse_list_of(value):
+        return [item_cast(x) for x in value.split(',') if x]
+    return parse_list_of
+
+
+def _tuple_spec_parser(_cls, cast):
+    item_cast = cast[0]
+
+    def parse_tuple_of(value):
+        val = value.strip('(').strip(')').split(',')
+        return tuple(item_cast(x) for x in val if x)
+    return parse_tuple_of
+
+
+def _dict_spec_parser(cls, cast):
+    # pylint: disable=protected-access
+    key_cast = cast.get('key', str)
+    value_parser = cls._get_parser(cast.get('value', str))
+    parsers_by_key = {
+        key: cls._get_parser(value_cast)
+        for key, value_cast in cast.get('cast', {}).items()
+    }
+
+    def parse_dict_of(value):
+        result = {}
+        for val in value.split(';'):
+            if val:
+                kv = val.split('=')
+                parser = parsers_by_key.get(kv[0], value_parser)
+                result[key_cast(kv[0])] = parser(kv[1])
+        return result
+    return parse_dict_of
+
+
+_PARSER_FACTORIES = {
+    bool: _bool_parser,
+    dict: _dict_parser,
+    list: _list_parser,
+    tuple: _tuple_parser,
+    float: _float_parser,
+}
+"""Factories of value parsers keyed by cast type.
+
+A factory receives the :py:class:`Env` class and returns a callable that
+parses a single raw value.
+"""
+
+_PARSERS = {}
+"""Parsers built by :py:meth:`Env._get_parser`, keyed by class and cast."""
+
+_PARSERS_MAXSIZE = 1024
+
+_LOADERS = {}
+"""Loaders built by :py:meth:`Settings.compile`, keyed by class and the
+options of the ``Env``."""
+
+
+# Errors of a single variable collected by Env.load() and Settings.load().
+_LOAD_ERRORS = (ImproperlyConfigured, LookupError, TypeError, ValueError)
+
+
+def _load_error(errors, prefix=''):
+    """Build the error reporting all the failed variables of a load."""
+    lines = '\n'.join(
+        f'  {prefix}{var}: {exc}' for var, exc in errors.items())
+    error = ImproperlyConfigured(
+        f'{len(errors)} environment variable(s) are missing or '
+        f'invalid:\n{lines}')
+    error.errors = errors
+    return error
+
+
+class _hybridmethod:
+    """Decorate a method bound to the instance when called on one, and to
+    the class otherwise."""
+
+    def __init__(self, func):
+        self.func = func
+        functools.update_wrapper(self, func)
+
+    def __get__(self, obj, objtype=None):
+        return self.func.__get__(objtype if obj is None else obj, objtype)
+
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'currsize'])
+"""Statistics of the :py:class:`Env` cast-result cache."""
+
+
 class NoValue:
     """Represent of no value object."""
 
     def __repr__(self):
         return f'<{self.__class__.__name__}>'
 
+    def __reduce__(self):
+        # Unpickle as the sentinel itself, which cache keys and scheme
+        # entries compare by identity.
+        if self is Env.NOTSET:
+            return 'Env.NOTSET'
+        return super().__reduce__()
+
 
 class DefaultValueWarning(UserWarning):
     """Warning used when returning an explicit default value."""
 
 
+class _SchemeEntry:
+    """Scheme declaration of a single variable, normalized once.
+
+    A declaration is either a cast (``int``, ``[str]``, ``{'value': int}``,
+    ...) or a ``(cast, default)`` pair. ``parser`` is that of the cast used
+    when the caller gives neither cast nor default, with smart casting: the
+    declared cast, or the type of the default. It is built by
+    :py:meth:`Env.compile`, again once :py:attr:`epoch` changes.
+    """
+
+    __slots__ = ('cast', 'default', 'smart_cast', 'parser', 'parser_epoch')
+
+    # Bumped by Env.register_parser(), making built parsers stale.
+    epoch = 0
+
+    def __init__(self, cast, default):
+        self.cast = cast
+        self.default = default
+        if cast is None and default is not None and \
+                not isinstance(default, NoValue):
+            cast = type(default)
+        self.smart_cast = cast
+        self.parser = None
+        self.parser_epoch = -1
+
+    @classmethod
+    def compile(cls, var_info, notset):
+        """Normalize a scheme declaration.
+
+        :param var_info: The declaration as passed to :py:class:`Env`.
+        :param notset: The marker used for a missing default.
+        :rtype: _SchemeEntry
+        """
+        if isinstance(var_info, (list, tuple)) and len(var_info) == 2:
+            return cls(var_info[0], var_info[1])
+        return cls(var_info, notset)
+
+    def resolve(self, cast, default, notset):
+        """Fill in the ``cast`` and ``default`` not given by the caller."""
+        if default is notset:
+            default = self.default
+        return cast or self.cast, default
+
+
+_VALUE_CACHE_MAXSIZE = 1024
+
+
+class _ValueCache:
+    """Cast results keyed by lookup.
+
+    Entries are ``(raw, generation, absent, result)`` tuples. They are valid
+    while the generation of the environment is unchanged or, failing that,
+    while the raw value of the variable is unchanged.
+    """
+
+    __slots__ = ('entries', 'hits', 'misses')
+
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(var_name, cast, default, flags):
+        """Return the key of a lookup, or ``None`` if it can't be cached."""
+        kind = default.__class__
+        if ((kind in _SCALARS or kind is NoValue)
+                and cast.__class__.__hash__ is not None
+                and not isinstance(cast, tuple)):
+            # Common case: a type and a scalar default, hashed as they are.
+            # The type of the default keeps e.g. ``True`` and ``1`` apart.
+            return (var_name, cast, kind, default, flags)
+        try:
+            return (var_name, _freeze(cast), _freeze(default), flags)
+        except TypeError:
+            return None
+
+    def get_fresh(self, key, generation):
+        """Return the entry of ``key`` if the environment is unchanged."""
+        if key is None or generation is None:
+            return None
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] == generation:
+            self.hits += 1
+            return entry
+        return None
+
+    def get_valid(self, key, raw, generation, absent):
+        """Return the entry of ``key`` if it was computed from ``raw``.
+
+        The entry is stamped with ``generation`` and ``absent``, whether
+        ``raw`` is the default of a missing variable: a variable may be set
+        to the value of its default.
+        """
+        entry = self.entries.get(key)
+        if entry is not None:
+            cached = entry[0]
+            if cached is raw or (type(cached) is type(raw) and cached == raw):
+                self.hits += 1
+                if entry[1] != generation or entry[2] != absent:
+                    entry = self.entries[key] = (
+                        cached, generation, absent, entry[3])
+                return entry
+        self.misses += 1
+        return None
+
+    def set(self, key, raw, generation, absent, result):
+        """Store the result of a lookup."""
+        # Bounded like the parser table: a cast built per call, such as a
+        # lambda, adds a new entry on every lookup.
+        if len(self.entries) >= _VALUE_CACHE_MAXSIZE:
+            self.entries.clear()
+        self.entries[key] = (
+            raw, generation, absent, _copy_if_mutable(result))
+
+    def clear(self):
+        """Drop all entries and reset the statistics."""
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
 class Env:
+    # pylint: disable=too-many-instance-attributes
     """Provide scheme-based lookups of environment variables so that each
     caller doesn't have to pass in ``cast`` and ``default`` parameters.
 
@@ -109,8 +782,11 @@ class Env:
 
     ENVIRON = os.environ
     NOTSET = NoValue()
-    BOOLEAN_TRUE_STRINGS = ('true', 'on', 'ok', 'y', 'yes', '1')
+    BOOLEAN_TRUE_STRINGS = frozenset(('true', 'on', 'ok', 'y', 'yes', '1'))
     URL_CLASS = ParseResult
+    # Files marking the root of a project, where read_env(search=True) stops.
+    SEARCH_MARKERS = ('.git', '.hg', '.svn', 'pyproject.toml', 'setup.py',
+                      'setup.cfg')
 
     POSTGRES_FAMILY = [
         'postgres',
@@ -220,13 +896,67 @@ class Env:
         "rediss+pubsub": "channels_redis.pubsub.RedisPubSubChannelLayer",
     }
 
-    def __init__(self, **scheme):
+    def __init__(self, *, environ=None, **scheme):
+        """
+        :param environ: Mapping to read the variables of this instance from,
+            instead of the class-wide :py:attr:`ENVIRON`.
+        :param scheme: Cast or ``(cast, default)`` of variables.
+        """
+        if environ is not None:
+            # pylint: disable-next=invalid-name
+            self.ENVIRON = self._wrap_environ(environ)
         self.smart_cast = True
         self.escape_proxy = False
         self.warn_on_default = False
+        self.cache_values = False
+        self.frozen = False
         self.prefix = ""
+        self._value_cache = _ValueCache()
+        self._accessors = {}
+        self._proxy_memo = None
+        self._absent = {}
+        self._graph = DependencyGraph()
+        self._key_index = None
         self.scheme = scheme
 
+    @property
+    def scheme(self):
+        """Mapping of variable names to their cast or ``(cast, default)``.
+
+        Assigning a new scheme compiles it. Call :py:meth:`compile` after
+        changing declarations of the current scheme in place.
+        """
+        return self._scheme
+
+    @scheme.setter
+    def scheme(self, scheme):
+        self._scheme = scheme
+        self.compile()
+
+    def compile(self):
+        """Normalize every scheme declaration into a lookup entry.
+
+        Variables added to :py:attr:`scheme` after compiling are still picked
+        up on first use; declarations changed in place require a new call.
+        """
+        notset = self.NOTSET
+        self._accessors = {
+            var_name: _SchemeEntry.compile(var_info, notset)
+            for var_name, var_info in self._scheme.items()
+        }
+        for accessor in self._accessors.values():
+            self._bind(accessor)
+
+    def _bind(self, accessor):
+        """Build the parser of a compiled scheme entry.
+
+        Subclasses overriding :py:meth:`parse_value` get none, and keep
+        casting through it.
+        """
+        accessor.parser_epoch = _SchemeEntry.epoch
+        if type(self).parse_value.__func__ is Env.parse_value.__func__:
+            accessor.parser = self._get_parser(accessor.smart_cast)
+
     def __call__(self, var, cast=None, default=NOTSET, parse_default=False):
         return self.get_value(
             var,
@@ -238,6 +968,154 @@ class Env:
     def __contains__(self, var):
         return var in self.ENVIRON
 
+    def scan(self, prefix='', cast=None):
+        """Return the variables whose name starts with ``prefix``.
+
+        Usage::
+
+            # {'FEATURE_BETA': True, 'FEATURE_SEARCH': False}
+            flags = env.scan('FEATURE_', cast=bool)
+
+        Values are looked up as with :py:meth:`get_value`. Names are sorted
+        and relative to the prefix of this ``Env``, like the names given to
+        lookups.
+
+        If the environment counts its changes (a
+        :py:class:`VersionedMapping` or a :py:meth:`snapshot`), names are
+        found by a binary search in a sorted index of the environment, which
+        is rebuilt when the environment changes. Other mappings are scanned
+        in full.
+
+        :param str prefix: Prefix of the names, after the ``Env`` prefix.
+        :param cast: Cast of the values.
+        :rtype: dict
+        """
+        start = f'{self.prefix}{prefix}'
+        skip = len(self.prefix)
+        return {
+            name[skip:]: self.get_value(name[skip:], cast=cast)
+            for name in self._scan_names(start)
+        }
+
+    def _scan_names(self, start):
+        """Return the sorted names of the environment starting with
+        ``start``."""
+        environ = self.ENVIRON
+        generation = 0 if self.frozen else getattr(
+            environ, 'generation', None)
+        if generation is None:
+            return sorted(
+                name for name in environ if name.startswith(start))
+
+        index = self._key_index
+        if index is None or index[0] is not environ or \
+                index[1] != generation:
+            index = self._key_index = (environ, generation, sorted(environ))
+        keys = index[2]
+        names = []
+        for position in range(bisect.bisect_left(keys, start), len(keys)):
+            name = keys[position]
+            if not name.startswith(start):
+                break
+            names.append(name)
+        return names
+
+    def namespace(self, prefix):
+        """Return a view of this ``Env`` with ``prefix`` appended to its own.
+
+        Usage::
+
+            redis = env.namespace('REDIS_')
+            redis('HOST')  # REDIS_HOST
+            redis.int('PORT', default=6379)  # REDIS_PORT
+
+        The view shares the environment, scheme and caches of this ``Env``;
+        nothing is copied, so views are cheap to create. Options (such as
+        ``smart_cast``) are those of this ``Env`` when the view is created.
+
+        :param str prefix: Prefix of the variables of the view.
+        :rtype: Env
+        """
+        view = object.__new__(type(self))
+        view.__dict__.update(self.__dict__)
+        view.prefix = f'{self.prefix}{prefix}'
+        return view
+
+    @property
+    def lazy(self):
+        """Lookups of this ``Env`` performed on first use of their value.
+
+        ``env.lazy.json('VAR')`` returns a :py:class:`LazyValue` standing in
+        for ``env.json('VAR')``, parsed the first time it is used.
+
+        :rtype: LazyEnv
+        """
+        return LazyEnv(self, self._graph)
+
+    def derived(self, func):
+        """Compute a value from lookups of this ``Env`` on first use.
+
+        Usage::
+
+            DATABASES = env.derived(lambda: {
+                'default': env.db(),
+                'replica': env.db('REPLICA_DATABASE_URL'),
+            })
+
+        Like the values of :py:attr:`lazy`, the result is a
+        :py:class:`LazyValue` whose dependencies on environment variables
+        (including proxies and ``_FILE`` variables) are recorded, so that
+        :py:meth:`invalidate` can reset it.
+
+        :param collections.abc.Callable func: callable without arguments.
+        :rtype: LazyValue
+        """
+        return LazyValue(func, self._graph)
+
+    def dependents(self, *names):
+        """Return the tracked values computed from any of the variables.
+
+        Tracked values are those of :py:attr:`lazy` and :py:meth:`derived`.
+        Names are those of the environment, prefix included.
+
+        :rtype: list[LazyValue]
+        """
+        return self._graph.dependents(names)
+
+    def invalidate(self, *names, recompute=False):
+        """Reset the tracked values computed from any of the variables.
+
+        Cached casts and file contents (see :py:class:`FileAwareEnv`) of the
+        variables are dropped too. Reset values are computed again on their
+        next use, or right away if ``recompute`` is true.
+
+        :param names: Names of the changed variables, prefix included.
+        :param bool recompute: Compute the reset values now.
+        :returns: The values that were reset.
+        :rtype: list[LazyValue]
+        """
+        names = set(names)
+        affected = self._graph.dependents(names)
+        for value in affected:
+            value._reset()  # pylint: disable=protected-access
+
+        entries = self._value_cache.entries
+        for key in [key for key in entries if key[0] in names]:
+            del entries[key]
+        for name in names:
+            self._absent.pop(name, None)
+        if isinstance(self.ENVIRON, FileAwareMapping):
+            files_cache = self.ENVIRON.files_cache
+            for name in names:
+                files_cache.pop(name, None)
+                if name.endswith('_FILE'):
+                    files_cache.pop(name[:-5], None)
+
+        if recompute:
+            for value in affected:
+                value._resolve()  # pylint: disable=protected-access
+        return affected
+
     def str(
             self,
             var,
@@ -283,11 +1161,22 @@ class Env:
         """
         return self.get_value(var, cast=int, default=default)
 
-    def float(self, var, default: Union[float, NoValue] = NOTSET) -> float:
+    def float(
+            self,
+            var,
+            default: Union[float, NoValue] = NOTSET,
+            strict=False) -> float:
         """
+        :param bool strict: Only accept values understood by
+            :py:class:`float`, without cleaning up thousands separators and
+            locale decimal commas.
         :rtype: float
         """
-        return self.get_value(var, cast=float, default=default)
+        return self.get_value(
+            var,
+            cast=_strict_float if strict else float,
+            default=default
+        )
 
     def json(self, var, default=NOTSET):
         """
@@ -426,6 +1315,7 @@ class Env:
         """
         return Path(self.get_value(var, default=default), **kwargs)
 
+    # pylint: disable-next=too-many-statements
     def get_value(self, var, cast=None, default=NOTSET, parse_default=False):
         """Return value for given environment variable.
 
@@ -446,55 +1336,205 @@ class Env:
             var, cast, type(default).__name__)
 
         var_name = f'{self.prefix}{var}'
-        if var_name in self.scheme:
-            var_info = self.scheme[var_name]
-
+        if DependencyGraph.computing and _tracking.frames:
+            self._record(var_name)
+        accessor = self._accessors.get(var_name)
+        if accessor is None and var_name in self._scheme:
+            accessor = self._accessor(var_name)
+        parser = None
+        if accessor is not None:
+            if cast is None and default is self.NOTSET and self.smart_cast:
+                if accessor.parser_epoch != _SchemeEntry.epoch:
+                    self._bind(accessor)
+                parser = accessor.parser
+            cast, default = accessor.resolve(cast, default, self.NOTSET)
+
+        if self.frozen:
+            generation = 0
+        else:
+            generation = getattr(self.ENVIRON, 'generation', None)
+
+        cache = key = None
+        if self.cache_values:
+            cache = self._value_cache
+            key = cache.key(var_name, cast, default, (
+                parse_default, self.smart_cast, self.escape_proxy))
+            entry = cache.get_fresh(key, generation)
+            if entry is not None:
+                if entry[2] and self.warn_on_default:
+                    self._warn_default(var_name)
+                result = entry[3]
+                if type(result) in _SCALARS:
+                    return result
+                return _copy_if_mutable(result)
+
+        if (default is not self.NOTSET and generation is not None
+                and self._absent.get(var_name) == generation):
+            # Known to be missing since the environment last changed.
+            value = default
+            absent = True
+        else:
             try:
-                has_default = len(var_info) == 2
-            except TypeError:
-                has_default = False
+                value = self.ENVIRON[var_name]
+                absent = False
+            except KeyError as exc:
+                if default is self.NOTSET:
+                    error_msg = f'Set the {var_name} environment variable'
+                    raise ImproperlyConfigured(error_msg) from exc
 
-            if has_default:
-                if not cast:
-                    cast = var_info[0]
+                value = default
+                absent = True
+                if generation is not None:
+                    self._absent[var_name] = generation
 
-                if default is self.NOTSET:
-                    try:
-                        default = var_info[1]
-                    except IndexError:
-                        pass
-            else:
-                if not cast:
-                    cast = var_info
+        if absent and self.warn_on_default:
+            self._warn_default(var_name)
+
+        # Resolve any proxied values
+        if hasattr(value, 'startswith') and value.startswith(
+                b'$' if isinstance(value, bytes) else '$'):
+            value, cast, default = self._resolve_proxy(
+                var_name, value, cast, default)
+            # The scheme of the target may give another cast.
+            parser = None
+
+        if key is None:
+            return self._cast_value(
+                value, cast, default, parse_default, parser)
+
+        entry = cache.get_valid(key, value, generation, absent)
+        if entry is not None:
+            return _copy_if_mutable(entry[3])
+        result = self._cast_value(value, cast, default, parse_default, parser)
+        cache.set(key, value, generation, absent, result)
+        return result
+
+    def _accessor(self, var_name):
+        """Return the compiled scheme entry of ``var_name``, if any."""
+        accessor = self._accessors.get(var_name)
+        if accessor is None and var_name in self._scheme:
+            accessor = self._accessors[var_name] = _SchemeEntry.compile(
+                self._scheme[var_name], self.NOTSET)
+        return accessor
+
+    def _record(self, *names):
+        """Record reads of ``names`` for the tracked value being computed."""
+        record(*names)
+        if isinstance(self.ENVIRON, FileAwareMapping):
+            record(*(f'{name}_FILE' for name in names))
 
+    @staticmethod
+    def _warn_default(var_name):
+        warnings.warn(
+            f'{var_name} environment variable not set; '
+            'using default value',
+            DefaultValueWarning,
+            stacklevel=3,
+        )
+
+    def _resolve_proxy(self, var_name, value, cast, default):
+        """Follow a chain of ``$VAR`` proxies to the value it points at.
+
+        The scheme of each variable of the chain fills in the ``cast`` and
+        ``default`` not given by the caller, as if the variable was looked
+        up itself.
+
+        :param str var_name: Name of the variable holding ``value``.
+        :param value: Proxied value, e.g. ``'$OTHER_VAR'``.
+        :param cast: Cast requested for ``var_name``.
+        :param default: Value used if a variable of the chain is not set.
+        :returns: The first value of the chain that is not a proxy, and the
+            cast and default to use for it.
+        """
+        prefix = b'$' if isinstance(value, bytes) else '$'
+        tracking = bool(DependencyGraph.computing and _tracking.frames)
+        # The memo does not know the chain of a target, which a tracked
+        # value depends on.
+        memo = None
+        if not tracking:
+            memo = self._proxy_memo
+            if memo is None:
+                passes = _resolution_passes.get()
+                memo = passes.get(id(self)) if passes else None
+        chain = [var_name]
+        seen = {var_name}
+        from_environ = True
+
+        while hasattr(value, 'startswith') and value.startswith(prefix):
+            target = value.lstrip(prefix)
+            if isinstance(target, bytes):
+                target = target.decode()
+            target = f'{self.prefix}{target}'
+
+            if memo is not None and target in memo:
+                value, tail = memo[target]
+                chain.extend(tail)
+                for name in tail:
+                    accessor = self._accessor(name)
+                    if accessor is not None:
+                        cast, default = accessor.resolve(
+                            cast, default, self.NOTSET)
+                break
+            if target in seen:
+                cycle = ' -> '.join(chain[chain.index(target):] + [target])
+                raise ImproperlyConfigured(
+                    f'Proxied value of {var_name} is circular: {cycle}')
+            seen.add(target)
+            chain.append(target)
+
+            accessor = self._accessor(target)
+            if accessor is not None:
+                cast, default = accessor.resolve(cast, default, self.NOTSET)
+            try:
+                value = self.ENVIRON[target]
+            except KeyError as exc:
+                if default is self.NOTSET:
+                    error_msg = f'Set the {target} environment variable'
+                    raise ImproperlyConfigured(error_msg) from exc
+                value = default
+                from_environ = False
+
+        if memo is not None and from_environ:
+            # The rest of the chain of each target, whose scheme applies.
+            for index in range(1, len(chain)):
+                memo[chain[index]] = (value, tuple(chain[index:]))
+        if tracking:
+            self._record(*chain[1:])
+        return value, cast, default
+
+    @contextmanager
+    def resolution_pass(self):
+        """Memoize proxy resolution for the duration of a ``with`` block.
+
+        Many variables pointing at the same ``$BASE_VAR`` resolve it once.
+        Changes to the environment made inside the block may not be seen by
+        proxies that were already resolved. The memo is local to the thread
+        (or asyncio task) running the block.
+        """
+        passes = _resolution_passes.get() or {}
+        if id(self) in passes:
+            yield self
+            return
+        token = _resolution_passes.set({**passes, id(self): {}})
         try:
-            value = self.ENVIRON[var_name]
-        except KeyError as exc:
-            if default is self.NOTSET:
-                error_msg = f'Set the {var_name} environment variable'
-                raise ImproperlyConfigured(error_msg) from exc
+            yield self
+        finally:
+            _resolution_passes.reset(token)
 
-            value = default
-            if self.warn_on_default:
-                warnings.warn(
-                    f'{var_name} environment variable not set; '
-                    'using default value',
-                    DefaultValueWarning,
-                    stacklevel=2,
-                )
+    # pylint: disable-next=too-many-arguments
+    def _cast_value(self, value, cast, default, parse_default, parser=None):
+        """Cast a raw value (or the default).
 
-        # Resolve any proxied values
+        ``parser``, the one of a compiled scheme entry, replaces smart
+        casting and :py:meth:`parse_value`.
+        """
         prefix = b'$' if isinstance(value, bytes) else '$'
         escape = rb'\$' if isinstance(value, bytes) else r'\$'
-        if hasattr(value, 'startswith') and value.startswith(prefix):
-            value = value.lstrip(prefix)
-            value = self.get_value(value, cast=cast, default=default)
-
         if self.escape_proxy and hasattr(value, 'replace'):
             value = value.replace(escape, prefix)
 
         # Smart casting
-        if self.smart_cast:
+        if self.smart_cast and parser is None:
             if cast is None and default is not None and \
                     not isinstance(default, NoValue):
                 cast = type(default)
@@ -502,10 +1542,191 @@ class Env:
         value = None if default is None and value == '' else value
 
         if value != default or (parse_default and value is not None):
-            value = self.parse_value(value, cast)
+            if parser is None:
+                value = self.parse_value(value, cast)
+            else:
+                value = parser(value)
 
         return value
 
+    def load(self, spec=None):
+        """Resolve many variables at once.
+
+        Usage::
+
+            settings = env.load({
+                'DEBUG': (bool, False),
+                'SECRET_KEY': str,
+                'ALLOWED_HOSTS': ([str], []),
+            })
+
+        Unlike separate lookups, every missing or invalid variable is
+        reported at once: a single :py:exc:`ImproperlyConfigured` is raised
+        listing all of them, with the individual exceptions available in its
+        ``errors`` attribute (a dict keyed by variable name). Proxied values
+        are resolved within a single :py:meth:`resolution_pass`.
+
+        :param spec: Mapping of variable names to a cast or a
+            ``(cast, default)`` pair, like the ``Env`` scheme. Defaults to the
+            variables of the scheme of this instance under its prefix.
+        :returns: Mapping of variable names, relative to the prefix of this
+            ``Env``, to their values.
+        :rtype: dict
+        """
+        if spec is None:
+            # Scheme names include the prefix, which get_value() adds back.
+            skip = len(self.prefix)
+            spec = {var[skip:]: var_info
+                    for var, var_info in self._scheme.items()
+                    if var.startswith(self.prefix)}
+
+        values = {}
+        errors = {}
+        with self.resolution_pass():
+            for var, var_info in spec.items():
+                entry = _SchemeEntry.compile(var_info, self.NOTSET)
+                try:
+                    values[var] = self.get_value(
+                        var, cast=entry.cast, default=entry.default)
+                # pylint: disable-next=catching-non-exception
+                except _LOAD_ERRORS as exc:
+                    errors[var] = exc
+
+        if errors:
+            raise _load_error(errors, self.prefix)
+
+        return values
+
+    def snapshot(self):
+        """Return a frozen copy of this ``Env``.
+
+        The environment is copied once into a read-only mapping that serves
+        every later lookup, and cast results are cached for the lifetime of
+        the copy. Use it when the configuration does not change after start
+        up. Writing to the environment of the copy (including with
+        :py:meth:`read_env`) raises :py:exc:`TypeError`.
+
+        :rtype: Env
+        """
+        # pylint: disable=protected-access
+        env = self._clone(MappingProxyType(dict(self.ENVIRON)))
+        env.frozen = True
+        env.cache_values = True
+        env._scheme = dict(self._scheme)
+        env._accessors = dict(self._accessors)
+        # The environment can't change, so proxies are resolved once.
+        env._proxy_memo = {}
+        return env
+
+    def with_environ(self, environ):
+        """Return a copy of this ``Env`` reading from another mapping.
+
+        Usage::
+
+            base = environ.Env(DEBUG=(bool, False), DATABASE_URL=str)
+            tenants = {
+                name: base.with_environ(mapping)
+                for name, mapping in tenant_environs.items()
+            }
+
+        The copy shares the compiled scheme and the options of this ``Env``
+        and has its own, empty caches. Use it to serve many isolated
+        environments with the same scheme.
+
+        :param environ: Mapping of the variables of the copy.
+        :rtype: Env
+        """
+        env = self._clone(self._wrap_environ(environ))
+        env.frozen = False
+        return env
+
+    def __getstate__(self):
+        """Return the state of this ``Env`` for pickling.
+
+        Caches are included, except for the cached casts whose lookup or
+        result can't be pickled (e.g. with a ``lambda`` cast). Unless the
+        ``Env`` is a snapshot, cached casts are revalidated against the raw
+        value of their variable on first use after unpickling, since the
+        environment may have changed meanwhile.
+        """
+        # pylint: disable=protected-access
+        state = self.__dict__.copy()
+        environ = state.get('ENVIRON')
+        if environ is os.environ:
+            state['ENVIRON'] = _OS_ENVIRON
+        elif isinstance(environ, MappingProxyType):
+            state['ENVIRON'] = dict(environ)
+            state['_read_only'] = True
+
+        entries = {
+            key: entry for key, entry in self._value_cache.entries.items()
+            if _picklable((key, entry))
+        }
+        if not self.frozen:
+            entries = {
+                key: (raw, None, absent, result)
+                for key, (raw, _, absent, result) in entries.items()
+            }
+            state['_absent'] = {}
+            state['_proxy_memo'] = None
+        state['_value_cache'] = entries
+        # Derived from the scheme, or not carried over.
+        del state['_accessors'], state['_graph']
+        state['_key_index'] = None
+        return state
+
+    def __setstate__(self, state):
+        environ = state.get('ENVIRON')
+        if isinstance(environ, str) and environ == _OS_ENVIRON:
+            state['ENVIRON'] = os.environ
+        if state.pop('_read_only', False):
+            state['ENVIRON'] = MappingProxyType(state['ENVIRON'])
+        cache = _ValueCache()
+        cache.entries = state['_value_cache']
+        state['_value_cache'] = cache
+        state['_graph'] = DependencyGraph()
+        self.__dict__.update(state)
+        self.compile()
+
+    def _clone(self, environ):
+        """Return a copy of this ``Env`` reading from ``environ``, sharing
+        the scheme and options but not the caches."""
+        # pylint: disable=protected-access,invalid-name
+        env = object.__new__(type(self))
+        # Attributes set one by one keep the compact layout of instance
+        # dicts shared with instances built by __init__, which are faster
+        # to read than a dict filled with update().
+        for name, value in self.__dict__.items():
+            setattr(env, name, value)
+        env.ENVIRON = environ
+        env._value_cache = _ValueCache()
+        env._absent = {}
+        env._graph = DependencyGraph()
+        env._key_index = None
+        env._proxy_memo = None
+        return env
+
+    @classmethod
+    def _wrap_environ(cls, environ):
+        """Adapt a mapping given as the environment of an instance."""
+        return environ
+
+    def cache_info(self):
+        """Report statistics of the cast-result cache.
+
+        The cache is only used when ``cache_values`` is enabled.
+
+        :rtype: CacheInfo
+        """
+        cache = self._value_cache
+        return CacheInfo(cache.hits, cache.misses, len(cache.entries))
+
+    def cache_clear(self):
+        """Clear the cast-result cache, its statistics and the record of
+        missing variables."""
+        self._value_cache.clear()
+        self._absent.clear()
+
     @classmethod
     def parse_value(cls, value, cast):
         """Parse and cast provided value
@@ -515,54 +1736,70 @@ class Env:
 
         :returns: Casted value
         """
-        if cast is None:
-            return value
-        if cast is bool:
+        return cls._get_parser(cast)(value)
+
+    @classmethod
+    def register_parser(cls, cast, parser):
+        """Register a parser for values cast as ``cast``.
+
+        The parser is used by :py:meth:`parse_value` (and so by every lookup)
+        instead of calling ``cast`` directly, including for the values of
+        ``dict`` cast specs. Parsers are shared by ``Env`` and its subclasses.
+
+        :param cast: Cast type the parser is registered for.
+        :param collections.abc.Callable parser: Callable receiving the raw
+            value and returning the parsed one.
+        """
+        _PARSER_FACTORIES[cast] = lambda _: parser
+        _PARSERS.clear()
+        _SchemeEntry.epoch += 1
+        # Loaders hold the parsers of their settings.
+        _LOADERS.clear()
+
+    @classmethod
+    def _get_parser(cls, cast):
+        """Return the parser for ``cast``, building it on first use.
+
+        Plain casts are looked up by identity, ``[cast]``, ``(cast,)`` and
+        ``dict`` specs by structure.
+        """
+        try:
+            return _PARSERS[cls, cast]
+        except KeyError:
+            key = (cls, cast)
+        except TypeError:
             try:
-                value = int(value) != 0
-            except ValueError:
-                value = value.lower().strip() in cls.BOOLEAN_TRUE_STRINGS
-        elif isinstance(cast, list):
-            value = list(map(cast[0], [x for x in value.split(',') if x]))
-        elif isinstance(cast, tuple):
-            val = value.strip('(').strip(')').split(',')
-            value = tuple(map(cast[0], [x for x in val if x]))
-        elif isinstance(cast, dict):
-            key_cast = cast.get('key', str)
-            value_cast = cast.get('value', str)
-            value_cast_by_key = cast.get('cast', {})
-            value = dict(map(
-                lambda kv: (
-                    key_cast(kv[0]),
-                    cls.parse_value(
-                        kv[1],
-                        value_cast_by_key.get(kv[0], value_cast)
-                    )
-                ),
-                [val.split('=') for val in value.split(';') if val]
-            ))
-        elif cast is dict:
-            value = dict([v.split('=', 1) for v in value.split(',') if v])
-        elif cast is list:
-            value = [x for x in value.split(',') if x]
-        elif cast is tuple:
-            val = value.strip('(').strip(')').split(',')
-            # pylint: disable=consider-using-generator
-            value = tuple([x for x in val if x])
-        elif cast is float:
-            # clean string
-            float_str = re.sub(r'[^\d,.-]', '', value)
-            # split for avoid thousand separator and different
-            # locale comma/dot symbol
-            parts = re.split(r'[,.]', float_str)
-            if len(parts) == 1:
-                float_str = parts[0]
-            else:
-                float_str = f"{''.join(parts[0:-1])}.{parts[-1]}"
-            value = float(float_str)
-        else:
-            value = cast(value)
-        return value
+                key = (cls, _freeze(cast))
+            except TypeError:
+                return cls._build_parser(cast)
+            parser = _PARSERS.get(key)
+            if parser is not None:
+                return parser
+
+        parser = cls._build_parser(cast)
+        if len(_PARSERS) >= _PARSERS_MAXSIZE:
+            _PARSERS.clear()
+        _PARSERS[key] = parser
+        return parser
+
+    @classmethod
+    def _build_parser(cls, cast):
+        """Build the parser for ``cast``."""
+        if cast is None:
+            return _identity
+        if isinstance(cast, list):
+            return _list_spec_parser(cls, cast)
+        if isinstance(cast, tuple):
+            return _tuple_spec_parser(cls, cast)
+        if isinstance(cast, dict):
+            return _dict_spec_parser(cls, cast)
+        try:
+            factory = _PARSER_FACTORIES.get(cast)
+        except TypeError:
+            factory = None
+        if factory is not None:
+            return factory(cls)
+        return cast
 
     @classmethod
     # pylint: disable=too-many-statements
@@ -997,32 +2234,79 @@ class Env:
 
         return config
 
-    @classmethod
+    @_hybridmethod
+    # pylint: disable=no-self-argument,too-many-arguments
     def read_env(cls, env_file=None, overwrite=False, parse_comments=False,
-                 encoding='utf8', **overrides):
+                 encoding='utf8', *, cache=False, precedence='last',
+                 interpolate=False, search=False, **overrides):
         r"""Read a .env file into os.environ.
 
         If not given a path to a dotenv path, does filthy magic stack
         backtracking to find the dotenv in the same directory as the file that
-        called ``read_env``.
+        called ``read_env``. With ``search``, the nearest one in that
+        directory or its parents is read instead, see :py:meth:`find_env`.
 
         Existing environment variables take precedent and are NOT overwritten
         by the file content. ``overwrite=True`` will force an overwrite of
         existing environment variables.
 
+        Called on an instance, the file is read into the environment of that
+        instance, which may differ from the class-wide ``ENVIRON``.
+
         :param env_file: The path to the ``.env`` file your application should
             use. If a path is not provided, `read_env` will attempt to import
-            the Django settings module from the Django project root.
+            the Django settings module from the Django project root. A file
+            descriptor, file object or iterator of lines is read as well,
+            see :py:meth:`iter_env`. The variables are applied at once, after
+            the whole file is read: nothing is applied if it can't be read
+            or decoded. A list or tuple of files is read as layers: the
+            files are read concurrently, missing ones are skipped, and their
+            variables are merged according to ``precedence``. If the file,
+            or every layer, is missing, nothing is applied, not even the
+            keyword arguments.
         :param overwrite: ``overwrite=True`` will force an overwrite of
             existing environment variables.
         :param parse_comments: Determines whether to recognize and ignore
            inline comments in the .env file. Default is False.
         :param encoding: The encoding to use when reading the environment file.
+        :param cache: Cache the variables parsed from a file given by path,
+            and parse it again only once it changed. ``True`` stores the cache
+            in the user cache directory; a path stores it in that directory.
+            See :py:class:`~environ.dotenv_cache.DotenvCache`.
+        :param precedence: Which of several layers setting a variable wins:
+            ``'last'`` (later files override earlier ones) or ``'first'``.
+        :param interpolate: Substitute ``${NAME}``, ``${NAME:-default}`` and
+            ``${NAME-default}`` references in values which are not
+            single-quoted, once, when the file is read. ``$$`` stands for
+            ``$``. A reference to a variable already set, and not
+            overwritten, resolves to its value in the environment.
+        :param search: Look for ``env_file`` (``'.env'`` by default) in the
+            directory of the file calling ``read_env``, or in the directory
+            given as ``search``, and then in its parents up to the root of
+            the project. Nothing is read if no file is found.
         :param \**overrides: Any additional keyword arguments provided directly
             to read_env will be added to the environment. If the key matches an
             existing environment variable, the value will be overridden.
         """
-        if env_file is None:
+        if getattr(cls, 'frozen', False):
+            raise TypeError(
+                'The environment of a frozen Env snapshot is read-only')
+
+        if search:
+            start = search
+            if search is True:
+                # pylint: disable=protected-access
+                frame = sys._getframe()
+                start = os.path.dirname(frame.f_back.f_code.co_filename)
+            name = '.env' if env_file is None else env_file
+            env_file = cls.find_env(start, name)
+            if env_file is None:
+                logger.info(
+                    "No %s found in %s or its parents - if you're not "
+                    "configuring your environment separately, create one.",
+                    name, start)
+                return
+        elif env_file is None:
             # pylint: disable=protected-access
             frame = sys._getframe()
             env_file = os.path.join(
@@ -1035,86 +2319,145 @@ class Env:
                     "environment separately, create one.", env_file)
                 return
 
-        try:
-            if isinstance(env_file, OPENABLE):
-                # Python 3.5 support (wrap path with str).
-                with open(str(env_file), encoding=encoding) as f:
-                    content = f.read()
-            else:
-                with env_file as f:
-                    content = f.read()
-        except OSError:
-            logger.info(
-                "%s not found - if you're not configuring your "
-                "environment separately, check this.", env_file)
-            return
-
-        logger.debug('Read environment variables from: %s', env_file)
-
-        def _keep_escaped_format_characters(match):
-            """Keep escaped newline/tabs in quoted strings"""
-            escaped_char = match.group(1)
-            if escaped_char in 'rnt':
-                return '\\' + escaped_char
-            return escaped_char
-
-        for line in content.splitlines():
-            m1 = re.match(r'\A(?:export )?([A-Za-z_0-9]+)=(.*)\Z', line)
-            if m1:
-
-                # Example:
-                #
-                # line: KEY_499=abc#def
-                # key:  KEY_499
-                # val:  abc#def
-                key, val = m1.group(1), m1.group(2)
-
-                if not parse_comments:
-                    # Default behavior
-                    #
-                    # Look for value in single quotes
-                    m2 = re.match(r"\A'(.*)'\Z", val)
-                    if m2:
-                        val = m2.group(1)
-                else:
-                    # Ignore post-# comments (outside quotes).
-                    # Something like ['val'  # comment] becomes ['val'].
-                    m2 = re.match(r"\A\s*'(?<!\\)(.*)'\s*(#.*\s*)?\Z", val)
-                    if m2:
-                        val = m2.group(1)
-                    else:
-                        # For no quotes, find value, ignore comments
-                        # after the first #
-                        m2a = re.match(r"\A(.*?)(#.*\s*)?\Z", val)
-                        if m2a:
-                            val = m2a.group(1)
-
-                # Look for value in double quotes
-                m3 = re.match(r'\A"(.*)"\Z', val)
-                if m3:
-                    val = re.sub(r'\\(.)', _keep_escaped_format_characters,
-                                 m3.group(1))
-
-                overrides[key] = str(val)
-            elif not line or line.startswith('#'):
-                # ignore warnings for empty line-breaks or comments
-                pass
-            else:
-                logger.warning('Invalid line: %s', line)
+        # The variables are all read before any is applied, so that a file
+        # which can't be read or decoded leaves the environment unchanged.
+        options = {'parse_comments': parse_comments, 'encoding': encoding,
+                   'cache': cache, 'interpolate': interpolate}
+        if isinstance(env_file, (list, tuple)):
+            variables = _read_env_layers(env_file, precedence, **options)
+            if variables is None:
+                # Like a missing file, without the keyword arguments.
+                return
+        else:
+            try:
+                variables = _parse_env_file(env_file, **options)
+            except OSError:
+                logger.info(
+                    "%s not found - if you're not configuring your "
+                    "environment separately, check this.", env_file)
+                return
+            logger.debug('Read environment variables from: %s', env_file)
+        if interpolate:
+            environ = cls.ENVIRON
+            if overrides:
+                # References see the keyword arguments as they are applied.
+                applied = {key: str(value) for key, value in overrides.items()}
+                environ = ChainMap(applied, environ) if overwrite \
+                    else ChainMap(environ, applied)
+            variables = _interpolate(
+                variables, environ, () if overwrite else cls.ENVIRON)
+
+        # Keyword arguments give values of variables missing from the file.
+        # A variable set earlier in the file is not an existing one: the
+        # last assignment wins.
+        values = dict(overrides)
+        values.update(variables)
+        cls.apply(values, overwrite)
+
+    @_hybridmethod
+    # pylint: disable=no-self-argument,too-many-arguments
+    def parse_env(cls, env_file, parse_comments=False, encoding='utf8', *,
+                  cache=False, precedence='last', interpolate=False):
+        """Parse a .env file into a dict, without touching the environment.
+
+        Takes the same arguments as :py:meth:`read_env`, including lists of
+        layered files. Pass the result to :py:meth:`apply`, or use it to
+        build the environment of a subprocess. With ``interpolate``,
+        references to variables the file does not define are resolved from
+        the environment (of the instance, if called on one).
+
+        :returns: The variables of the file, the last assignment of a variable
+            winning.
+        :rtype: dict[str, str]
+        :raises OSError: If the file cannot be read. Layers which cannot be
+            read are skipped.
+        """
+        options = {'parse_comments': parse_comments, 'encoding': encoding,
+                   'cache': cache, 'interpolate': interpolate}
+        if isinstance(env_file, (list, tuple)):
+            values = _read_env_layers(
+                env_file, precedence, **options) or {}
+        else:
+            values = _parse_env_file(env_file, **options)
+        if interpolate:
+            values = _interpolate(values, cls.ENVIRON)
+        return values
+
+    @_hybridmethod
+    # pylint: disable=no-self-argument
+    def apply(cls, values, overwrite=False):
+        """Set environment variables from a mapping, in a single update.
+
+        Called on an instance, the variables are set in the environment of
+        that instance. Applied to :py:data:`os.environ`, each variable is
+        still set with its own ``putenv`` call, while a plain ``dict`` or a
+        :py:class:`VersionedMapping` is updated at once.
+
+        :param collections.abc.Mapping values: Variables to set. Values are
+            converted with :py:class:`str`.
+        :param overwrite: Overwrite variables which are already set.
+        :returns: The variables which were set.
+        :rtype: dict[str, str]
+        """
+        if getattr(cls, 'frozen', False):
+            raise TypeError(
+                'The environment of a frozen Env snapshot is read-only')
+        environ = cls.ENVIRON
+        values = {key: str(value) for key, value in values.items()
+                  if overwrite or key not in environ}
+        if values:
+            environ.update(values)
+        return values
 
-        def set_environ(envval):
-            """Return lambda to set environ.
+    @classmethod
+    def find_env(cls, start, filename='.env'):
+        """Return the path of the nearest .env file, or None.
+
+        ``filename`` is looked for in ``start``, then in its parents up to
+        the first directory containing one of :py:attr:`SEARCH_MARKERS`
+        (the root of a version control checkout or of a Python project), or
+        up to the root of the file system. A found path is remembered:
+        later searches from the same directory return it without file
+        system access, until :py:meth:`clear_search_cache` is called.
+        Searches which found nothing are repeated.
+
+        :param start: The directory to start from.
+        :param filename: The name of the file.
+        :rtype: str or None
+        """
+        return _find_env(os.path.abspath(start), os.fspath(filename),
+                         tuple(cls.SEARCH_MARKERS))
 
-             Use setdefault unless overwrite is specified.
-             """
-            if overwrite:
-                return lambda k, v: envval.update({k: str(v)})
-            return lambda k, v: envval.setdefault(k, str(v))
+    @staticmethod
+    def clear_search_cache():
+        """Forget the paths found by :py:meth:`find_env`.
 
-        setenv = set_environ(cls.ENVIRON)
+        Call it after creating, moving or removing a .env file which an
+        earlier search may have found, e.g. between tests.
+        """
+        _FOUND_ENVS.clear()
 
-        for key, value in overrides.items():
-            setenv(key, value)
+    @classmethod
+    def iter_env(cls, env_file, parse_comments=False, encoding='utf8'):
+        """Parse a .env file, yielding its variables as they are read.
+
+        The file is read in blocks and parsed line by line, so that memory use
+        does not grow with its size, and nothing is written to the
+        environment. Variables assigned several times are yielded every time.
+
+        :param env_file: The path to the ``.env`` file, a file descriptor
+            (e.g. of a pipe, left open), a text file object (closed when done)
+            or an iterable of lines.
+        :param parse_comments: Recognize and ignore inline comments, as with
+            :py:meth:`read_env`.
+        :param encoding: The encoding of a path or file descriptor.
+        :returns: A generator of ``(key, value, lineno)`` tuples, ``lineno``
+            counting from 1.
+        :raises OSError: If the file cannot be read.
+        """
+        chunks = _env_chunks(env_file, encoding)
+        for key, value, _, lineno in _tokenize_env(chunks, parse_comments):
+            yield key, value, lineno
 
 
 class FileAwareEnv(Env):
@@ -1134,6 +2477,12 @@ class FileAwareEnv(Env):
     """
     ENVIRON = FileAwareMapping()
 
+    @classmethod
+    def _wrap_environ(cls, environ):
+        if isinstance(environ, FileAwareMapping):
+            return environ
+        return FileAwareMapping(env=environ)
+
 
 class Path:
     """Inspired to Django Two-scoops, handling File Paths in Settings."""
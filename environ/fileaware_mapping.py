@@ -12,8 +12,10 @@
 import os
 from collections.abc import MutableMapping
 
+from .versioned_mapping import _EnvironWrapper
 
-class FileAwareMapping(MutableMapping):
+
+class FileAwareMapping(_EnvironWrapper, MutableMapping):
     """
     A mapping that wraps os.environ, first checking for the existence of a key
     appended with ``_FILE`` whenever reading a value. If a matching file key is
@@ -24,6 +26,10 @@ class FileAwareMapping(MutableMapping):
 
     A ``_FILE`` key has higher precedence than a value is set directly in the
     environment, and an exception is raised if the file can not be found.
+
+    If the wrapped mapping counts its changes (see
+    :py:class:`~environ.VersionedMapping`), the file cache is dropped whenever
+    the wrapped mapping changes.
     """
 
     def __init__(self, env=None, cache=True):
@@ -40,10 +46,26 @@ class FileAwareMapping(MutableMapping):
         self.env = env if env is not None else os.environ
         self.cache = cache
         self.files_cache = {}
+        self._files_generation = getattr(self.env, 'generation', None)
+
+    @property
+    def generation(self):
+        """
+        Change counter of the wrapped mapping, or ``None`` if changes can not
+        be detected (including when file contents are not cached).
+        """
+        if not self.cache:
+            return None
+        return getattr(self.env, 'generation', None)
 
     def __getitem__(self, key):
-        if self.cache and key in self.files_cache:
-            return self.files_cache[key]
+        if self.cache:
+            generation = getattr(self.env, 'generation', None)
+            if generation != self._files_generation:
+                self.files_cache.clear()
+                self._files_generation = generation
+            if key in self.files_cache:
+                return self.files_cache[key]
         key_file = self.env.get(key + "_FILE")
         if key_file:
             with open(key_file, encoding='utf-8') as f:
@@ -0,0 +1,318 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Values resolved on first use."""
+
+import functools
+import operator
+import os
+import threading
+import weakref
+
+_UNSET = object()
+
+
+class _Tracking(threading.local):
+    """Per-thread stack of the variable names read by tracked values."""
+
+    frames = None
+
+
+_tracking = _Tracking()
+
+
+def record(*names):
+    """Record reads of the environment variables ``names``.
+
+    The names are added to the dependencies of the tracked values being
+    computed in the current thread, if any.
+    """
+    frames = _tracking.frames
+    if frames:
+        frames[-1].update(names)
+
+
+class DependencyGraph:
+    """
+    Tracked values keyed by the environment variables they were computed
+    from.
+
+    The dependencies of a value are recorded while it is computed, and
+    replaced when it is computed again. Values are referenced weakly.
+    """
+
+    #: Number of tracked values being computed, in all threads. Lookups
+    #: only look for the per-thread record of reads when it is not zero.
+    computing = 0
+    _computing_lock = threading.Lock()
+
+    def __init__(self):
+        self._dependents = {}
+        self._values = {}
+        self._lock = threading.RLock()
+        _graphs.add(self)
+
+    def compute(self, value):
+        """Compute a tracked value, recording the variables it reads."""
+        frames = _tracking.frames
+        if frames is None:
+            frames = _tracking.frames = []
+        names = set()
+        frames.append(names)
+        with self._computing_lock:
+            DependencyGraph.computing += 1
+        try:
+            result = value._factory()  # pylint: disable=protected-access
+        finally:
+            frames.pop()
+            with self._computing_lock:
+                DependencyGraph.computing -= 1
+        self._link(value, frozenset(names))
+        return result
+
+    def _link(self, value, names):
+        key = id(value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                ref = weakref.ref(value, functools.partial(self._forget, key))
+            else:
+                ref = entry[0]
+                self._unlink(key, entry[1])
+            self._values[key] = (ref, names)
+            for name in names:
+                self._dependents.setdefault(name, set()).add(key)
+        object.__setattr__(value, '_depends', names)
+
+    def _unlink(self, key, names):
+        for name in names:
+            keys = self._dependents.get(name)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._dependents[name]
+
+    def _forget(self, key, _ref=None):
+        with self._lock:
+            entry = self._values.pop(key, None)
+            if entry is not None:
+                self._unlink(key, entry[1])
+
+    def dependents(self, names):
+        """Return the live values computed from any of ``names``."""
+        with self._lock:
+            keys = set()
+            for name in names:
+                keys.update(self._dependents.get(name, ()))
+            refs = [self._values[key][0] for key in keys]
+        return [value for value in (ref() for ref in refs)
+                if value is not None]
+
+
+def _evaluated(value):
+    """Unpickle a lazy value as the value it stood for."""
+    return value
+
+
+def _forward(func):
+    """Forward ``func(self, *args)`` to the resolved value."""
+    def method(self, *args):
+        # pylint: disable-next=protected-access
+        return func(self._resolve(), *args)
+    return method
+
+
+def _reflect(func):
+    """Forward the reflected operator ``func(other, self)``."""
+    def method(self, other):
+        # pylint: disable-next=protected-access
+        return func(other, self._resolve())
+    return method
+
+
+_graphs = weakref.WeakSet()
+
+
+def _after_fork_in_child():
+    """Reset the locks a thread of the parent process may have held."""
+    # pylint: disable=protected-access
+    DependencyGraph._computing_lock = threading.Lock()
+    DependencyGraph.computing = len(_tracking.frames or ())
+    for graph in list(_graphs):
+        graph._lock = threading.RLock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+class LazyValue:
+    """
+    A value computed by ``factory`` the first time it is used.
+
+    The proxy forwards attribute access, item access, iteration, comparisons,
+    arithmetic and conversions to the value, and claims its class so that
+    :py:func:`isinstance` checks pass. The value is cached once computed; an
+    exception raised by ``factory`` is propagated to the code using the value
+    and the computation is tried again on the next use.
+    """
+
+    __slots__ = ('_factory', '_value', '_graph', '_depends', '__weakref__')
+
+    def __init__(self, factory, graph=None):
+        """
+        Initialize the proxy.
+
+        :param collections.abc.Callable factory: callable without arguments
+            computing the value.
+        :param DependencyGraph or None graph: graph recording the
+            environment variables the value is computed from.
+        """
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_value', _UNSET)
+        object.__setattr__(self, '_graph', graph)
+        object.__setattr__(self, '_depends', frozenset())
+
+    # The methods of the proxy are underscored to not shadow the attributes
+    # of the value.
+
+    def _resolve(self):
+        """Return the value, computing it on first use."""
+        value = self._value
+        graph = self._graph
+        if value is _UNSET:
+            if graph is None:
+                value = self._factory()
+            else:
+                value = graph.compute(self)
+            object.__setattr__(self, '_value', value)
+        if graph is not None and DependencyGraph.computing and \
+                _tracking.frames:
+            # A value computed from this one depends on the same variables.
+            _tracking.frames[-1].update(self._depends)
+        return value
+
+    def _reset(self):
+        """Drop the computed value, so that the next use computes it again."""
+        object.__setattr__(self, '_value', _UNSET)
+
+    @property
+    def __class__(self):
+        return self._resolve().__class__
+
+    def __getattr__(self, name):
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._resolve(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._resolve(), name)
+
+    def __dir__(self):
+        return dir(self._resolve())
+
+    def __repr__(self):
+        return repr(self._resolve())
+
+    def __hash__(self):
+        return hash(self._resolve())
+
+    def __reduce_ex__(self, protocol):
+        # Pickle (and copy) the value, not the proxy.
+        return _evaluated, (self._resolve(),)
+
+    def __call__(self, *args, **kwargs):
+        return self._resolve()(*args, **kwargs)
+
+    __str__ = _forward(str)
+    __bytes__ = _forward(bytes)
+    __format__ = _forward(format)
+    __bool__ = _forward(bool)
+    __int__ = _forward(int)
+    __float__ = _forward(float)
+    __complex__ = _forward(complex)
+    __index__ = _forward(operator.index)
+    __len__ = _forward(len)
+    __iter__ = _forward(iter)
+    __reversed__ = _forward(reversed)
+    __fspath__ = _forward(os.fspath)
+
+    __contains__ = _forward(operator.contains)
+    __getitem__ = _forward(operator.getitem)
+    __setitem__ = _forward(operator.setitem)
+    __delitem__ = _forward(operator.delitem)
+
+    __eq__ = _forward(operator.eq)
+    __ne__ = _forward(operator.ne)
+    __lt__ = _forward(operator.lt)
+    __le__ = _forward(operator.le)
+    __gt__ = _forward(operator.gt)
+    __ge__ = _forward(operator.ge)
+
+    __neg__ = _forward(operator.neg)
+    __pos__ = _forward(operator.pos)
+    __abs__ = _forward(operator.abs)
+    __invert__ = _forward(operator.invert)
+
+    __add__ = _forward(operator.add)
+    __sub__ = _forward(operator.sub)
+    __mul__ = _forward(operator.mul)
+    __truediv__ = _forward(operator.truediv)
+    __floordiv__ = _forward(operator.floordiv)
+    __mod__ = _forward(operator.mod)
+    __pow__ = _forward(operator.pow)
+    __and__ = _forward(operator.and_)
+    __or__ = _forward(operator.or_)
+    __xor__ = _forward(operator.xor)
+    __radd__ = _reflect(operator.add)
+    __rsub__ = _reflect(operator.sub)
+    __rmul__ = _reflect(operator.mul)
+    __rtruediv__ = _reflect(operator.truediv)
+    __rfloordiv__ = _reflect(operator.floordiv)
+    __rmod__ = _reflect(operator.mod)
+    __rpow__ = _reflect(operator.pow)
+    __rand__ = _reflect(operator.and_)
+    __ror__ = _reflect(operator.or_)
+    __rxor__ = _reflect(operator.xor)
+
+
+class LazyEnv:
+    """
+    Lazy counterpart of an ``Env``, available as ``env.lazy``.
+
+    Every lookup method of the ``Env`` is available, returning a
+    :py:class:`LazyValue` that performs the lookup on first use::
+
+        SEARCH = env.lazy.search_url('SEARCH_URL', default='simple://')
+        RETRIES = env.lazy.int('RETRIES', default=3)
+        REDIS = env.lazy('REDIS_URL')
+    """
+
+    __slots__ = ('env', 'graph')
+
+    def __init__(self, env, graph=None):
+        self.env = env
+        self.graph = graph
+
+    def __call__(self, *args, **kwargs):
+        return LazyValue(
+            functools.partial(self.env, *args, **kwargs), self.graph)
+
+    def __getattr__(self, name):
+        method = getattr(self.env, name)
+        if not callable(method):
+            raise AttributeError(
+                f'{type(self.env).__name__}.{name} is not a lookup method')
+
+        @functools.wraps(method)
+        def lazy_lookup(*args, **kwargs):
+            return LazyValue(
+                functools.partial(method, *args, **kwargs), self.graph)
+        return lazy_lookup
@@ -0,0 +1,288 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Declarative settings classes compiled into loader functions."""
+
+import typing
+import warnings
+
+from .environ import (
+    _load_error,
+    _LOAD_ERRORS,
+    _LOADERS,
+    DefaultValueWarning,
+    Env,
+    ImproperlyConfigured,
+)
+
+_NoneType = type(None)
+
+
+class Field:
+    """Declaration of a single setting, see :py:func:`field`."""
+
+    __slots__ = ('cast', 'default', 'env', 'parse_default')
+
+    def __init__(self, cast=None, default=Env.NOTSET, env=None,
+                 parse_default=False):
+        self.cast = cast
+        self.default = default
+        self.env = env
+        self.parse_default = parse_default
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(cast={self.cast!r}, '
+                f'default={self.default!r}, env={self.env!r})')
+
+
+def field(cast=None, default=Env.NOTSET, env=None, parse_default=False):
+    """Declare a setting of a :py:class:`Settings` class.
+
+    :param cast: Cast of the value, as accepted by
+        :py:meth:`Env.parse_value`. Overrides the annotation of the setting.
+    :param default: Value used if the variable is not set. The setting is
+        required if no default is given.
+    :param str or None env: Name of the environment variable, defaults to
+        the name of the setting.
+    :param bool parse_default: Cast the default value too.
+    :rtype: Field
+    """
+    return Field(cast, default, env, parse_default)
+
+
+def _postponed(annotation):
+    """Return whether an annotation needs :py:func:`typing.get_type_hints`,
+    which is slow, to be evaluated."""
+    if isinstance(annotation, (str, typing.ForwardRef)):
+        return True
+    return any(map(_postponed, typing.get_args(annotation)))
+
+
+def _annotation_cast(annotation):
+    """Translate a type annotation into an ``Env`` cast."""
+    origin = typing.get_origin(annotation)
+    if origin is None:
+        return annotation
+    args = [arg for arg in typing.get_args(annotation) if arg is not Ellipsis]
+    if origin is typing.Union:
+        # Optional[X]: a default of None already allows a missing value.
+        args = [arg for arg in args if arg is not _NoneType]
+        if len(args) == 1:
+            return _annotation_cast(args[0])
+    elif origin is list and len(args) == 1:
+        return [_annotation_cast(args[0])]
+    elif origin is tuple and len(args) == 1:
+        return (_annotation_cast(args[0]),)
+    elif origin is dict and len(args) == 2:
+        return {'value': _annotation_cast(args[1])}
+    elif not args:
+        return origin
+    raise TypeError(f'Unsupported settings annotation: {annotation!r}')
+
+
+class Settings:
+    """Base class of declarative settings.
+
+    Settings are declared as annotated class attributes, named like their
+    environment variable. The annotation is the cast, the value (if any)
+    the default, and :py:func:`field` takes further options::
+
+        class AppSettings(environ.Settings):
+            DEBUG: bool = False
+            SECRET_KEY: str
+            PORT: int = 8000
+            ALLOWED_HOSTS: list[str] = []
+            TIMEOUT: float = environ.field(env='DB_TIMEOUT', default=5.0)
+
+        settings = AppSettings.load()
+        settings.PORT
+
+    On first use the declarations are compiled into a loader, with one
+    function per setting whose variable name, parser and default handling
+    are worked out ahead, so that resolving the class makes no generic
+    :py:meth:`Env.get_value` call. Values behave as
+    with :py:meth:`Env.get_value`: proxied (``$VAR``) and escaped values are
+    delegated to it. The scheme and value cache of the ``Env`` are not used.
+    """
+
+    @classmethod
+    def fields(cls):
+        """Return the declared settings, keyed by attribute name.
+
+        :rtype: dict[str, Field]
+        """
+        annotations = {}
+        result = {}
+        for klass in reversed(cls.__mro__):
+            own = vars(klass)
+            for name, annotation in own.get('__annotations__', {}).items():
+                annotations[name] = annotation
+                if not name.startswith('_'):
+                    result[name] = own.get(name, Env.NOTSET)
+            for name, value in own.items():
+                if isinstance(value, Field) or (
+                        name in result and not name.startswith('_')):
+                    # Declared with field() or a new default of a setting
+                    # declared by a base class.
+                    result[name] = value
+
+        if any(map(_postponed, annotations.values())):
+            annotations = typing.get_type_hints(cls)
+
+        for name, declared in result.items():
+            if not isinstance(declared, Field):
+                declared = Field(default=declared)
+            cast = declared.cast
+            if cast is None and name in annotations:
+                cast = _annotation_cast(annotations[name])
+            result[name] = Field(cast, declared.default,
+                                 declared.env or name, declared.parse_default)
+        return result
+
+    @classmethod
+    def load(cls, env=None):
+        """Resolve the settings from the environment of ``env``.
+
+        :param Env or None env: ``Env`` to read from, with its prefix and
+            options. Defaults to a new ``Env``.
+        :returns: An instance of the class with one attribute per setting.
+        :raises ImproperlyConfigured: listing every missing or invalid
+            variable, with the individual exceptions in its ``errors``
+            attribute.
+        """
+        if env is None:
+            env = Env()
+        return cls.compile(env)(env.ENVIRON, env, cls)
+
+    @classmethod
+    def compile(cls, env):
+        """Return the loader function of the class for ``env``.
+
+        Loaders are cached per class and ``Env`` options, and rebuilt if a
+        parser is registered with :py:meth:`Env.register_parser` afterwards.
+        """
+        key = (cls, type(env), env.prefix, env.smart_cast, env.escape_proxy,
+               env.warn_on_default)
+        loader = _LOADERS.get(key)
+        if loader is None:
+            loader = _LOADERS[key] = _build_loader(cls.fields(), env)
+        return loader
+
+    def __repr__(self):
+        values = ', '.join(
+            f'{name}={getattr(self, name)!r}' for name in self.fields()
+            if hasattr(self, name))
+        return f'{self.__class__.__name__}({values})'
+
+
+def _build_loader(fields, env):
+    """Build a loader of ``fields``, calling one resolver per setting."""
+    resolvers = tuple(
+        (name, _field_resolver(declared, env))
+        for name, declared in fields.items())
+    prefix = env.prefix
+
+    def load(environ, env, cls):
+        errors = {}
+        values = {}
+        for name, resolve in resolvers:
+            values[name] = resolve(environ, env, errors)
+        if errors:
+            raise _load_error(errors, prefix)
+        self = object.__new__(cls)
+        self.__dict__.update(values)
+        return self
+
+    return load
+
+
+def _field_resolver(declared, env):
+    """Return the function resolving a single setting.
+
+    The variable name, parser and handling of the default are worked out
+    here, once: the function only looks the variable up and parses it.
+    Failures are stored in ``errors`` under the name of the setting.
+    """
+    # pylint: disable=catching-non-exception
+    cast, default = declared.cast, declared.default
+    name, parse_default = declared.env, declared.parse_default
+    var_name = f'{env.prefix}{name}'
+    if env.smart_cast and cast is None and default is not None and \
+            default is not Env.NOTSET:
+        cast = type(default)
+    # pylint: disable-next=protected-access
+    parser = type(env)._get_parser(cast)
+
+    def delegate(env, errors):
+        # Slow path, shared by values the resolver does not handle.
+        try:
+            return env.get_value(name, declared.cast, default, parse_default)
+        except _LOAD_ERRORS as exc:
+            errors[name] = exc
+            return None
+
+    if default is Env.NOTSET:
+        message = f'Set the {var_name} environment variable'
+
+        def missing(_env, errors):
+            errors[name] = ImproperlyConfigured(message)
+    elif isinstance(default, bytes) or isinstance(default, str) and (
+            default.startswith('$')
+            or env.escape_proxy and '\\$' in default):
+        # Proxied or escaped default values.
+        missing = delegate
+    else:
+        warning = None
+        if env.warn_on_default:
+            warning = (f'{var_name} environment variable not set; '
+                       'using default value')
+        parse = parse_default and default is not None
+
+        def missing(_env, errors):
+            if warning is not None:
+                # Called by resolve(), load() and Settings.load().
+                warnings.warn(warning, DefaultValueWarning, stacklevel=5)
+            if not parse:
+                return default
+            try:
+                return parser(default)
+            except _LOAD_ERRORS as exc:
+                errors[name] = exc
+                return None
+
+    if default is None:
+        def cast_value(value):
+            return None if value == '' else parser(value)
+    elif isinstance(default, str) and not parse_default:
+        def cast_value(value):
+            return value if value == default else parser(value)
+    elif default is Env.NOTSET or isinstance(default, str) or parse_default:
+        cast_value = parser
+    else:
+        def cast_value(value):
+            return parser(value) if value != default else value
+
+    escape_proxy = env.escape_proxy
+
+    def resolve(environ, env, errors):
+        try:
+            value = environ[var_name]
+        except KeyError:
+            return missing(env, errors)
+        # Proxies and escaped values are cast by Env.get_value().
+        if value.__class__ is not str or value[:1] == '$' or (
+                escape_proxy and '\\$' in value):
+            return delegate(env, errors)
+        try:
+            return cast_value(value)
+        except _LOAD_ERRORS as exc:
+            errors[name] = exc
+            return None
+
+    return resolve
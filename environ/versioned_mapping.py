@@ -0,0 +1,86 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Environment mapping with change detection."""
+
+import os
+from collections.abc import MutableMapping
+
+# Stands for os.environ in pickled mappings.
+_OS_ENVIRON = 'os.environ'
+
+
+class _EnvironWrapper:
+    """Pickle support of mappings wrapping ``os.environ`` as ``env``."""
+
+    def __getstate__(self):
+        # os.environ can't be pickled: refer to the one of the process
+        # unpickling the mapping instead.
+        state = self.__dict__.copy()
+        if state['env'] is os.environ:
+            state['env'] = _OS_ENVIRON
+        return state
+
+    def __setstate__(self, state):
+        if isinstance(state['env'], str) and state['env'] == _OS_ENVIRON:
+            state['env'] = os.environ
+        self.__dict__.update(state)
+
+
+class VersionedMapping(_EnvironWrapper, MutableMapping):
+    """
+    A mapping that wraps os.environ and counts the changes made through it.
+
+    The ``generation`` counter is bumped on every ``__setitem__``,
+    ``__delitem__`` and ``update``, so caches built on top of the mapping can
+    tell whether the environment changed with a single integer compare.
+
+    Changes made to the wrapped mapping directly (e.g. to ``os.environ``
+    after wrapping it) are not counted.
+    """
+
+    def __init__(self, env=None):
+        """
+        Initialize the mapping.
+
+        :param env:
+            where to read environment variables from (defaults to
+            ``os.environ``)
+        """
+        self.env = env if env is not None else os.environ
+        self.generation = 0
+
+    def __getitem__(self, key):
+        return self.env[key]
+
+    def __contains__(self, key):
+        return key in self.env
+
+    def __iter__(self):
+        return iter(self.env)
+
+    def __len__(self):
+        return len(self.env)
+
+    def __setitem__(self, key, value):
+        self.env[key] = value
+        self.generation += 1
+
+    def __delitem__(self, key):
+        del self.env[key]
+        self.generation += 1
+
+    def get(self, key, default=None):
+        return self.env.get(key, default)
+
+    # pylint: disable=arguments-differ
+    def update(self, other=(), /, **kwargs):
+        """Update the wrapped mapping, counting a single change."""
+        self.env.update(other, **kwargs)
+        self.generation += 1
@@ -0,0 +1,331 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+"""Reload the variables of .env files when the files change."""
+
+import logging
+import os
+import sys
+import threading
+
+from .environ import _interpolate, _parse_env_file
+from .versioned_mapping import VersionedMapping
+
+logger = logging.getLogger(__name__)
+
+# inotify(7) flags and events.
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_IN_EVENTS = (
+    0x00000004  # IN_ATTRIB
+    | 0x00000008  # IN_CLOSE_WRITE
+    | 0x00000040  # IN_MOVED_FROM
+    | 0x00000080  # IN_MOVED_TO
+    | 0x00000100  # IN_CREATE
+    | 0x00000200  # IN_DELETE
+)
+_IN_EVENT = 'iIII'
+
+
+def _signature(path):
+    """Return what identifies the version of a file, or None if missing."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino, stat.st_dev
+
+
+def _libc_inotify():
+    """Return ``inotify_init1`` and ``inotify_add_watch``, if available."""
+    if not sys.platform.startswith('linux'):
+        return None
+    # Imported here, so that importing environ does not load ctypes.
+    # pylint: disable=import-outside-toplevel
+    import ctypes
+    import ctypes.util
+    try:
+        libc = ctypes.CDLL(
+            ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        init, add_watch = libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    init.argtypes = [ctypes.c_int]
+    add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return init, add_watch
+
+
+class EnvWatcher:
+    # pylint: disable=too-many-instance-attributes
+    """
+    Watch .env files and apply their changes to the environment of an
+    ``Env``.
+
+    The files are parsed when the watcher is created, as the baseline of
+    later changes; read them with :py:meth:`Env.read_env` first. When a file
+    changes it is parsed again and the difference with the previous content
+    is applied under a lock: new and modified variables are set in a single
+    update, then removed ones deleted. The mapping is changed in place, so
+    other threads reading it meanwhile may see some of the changes only;
+    with a :py:class:`~environ.VersionedMapping` the whole difference is
+    counted as a single change, once applied, so that cached values stay
+    consistent. Variables whose value in the environment no longer
+    comes from the files (e.g. set by the process environment, which
+    takes precedence) are left alone unless ``overwrite`` is true. The
+    cached values of the changed variables are then invalidated with
+    :py:meth:`Env.invalidate`, and the callbacks are called with their
+    names::
+
+        env.read_env(['.env', '.env.local'])
+        watcher = environ.EnvWatcher(env, ['.env', '.env.local'])
+        watcher.add_callback(lambda changed: logger.info('%s', changed))
+        watcher.start()
+
+    Changes are detected by polling the stat of the files every
+    ``interval`` seconds, or with inotify on Linux, which also polls at the
+    same interval as a fallback. A file which is missing or cannot be read
+    keeps its previous variables until it can be read again.
+    """
+
+    def __init__(self, env, env_file, interval=1.0, backend='auto',
+                 overwrite=False, **options):
+        """
+        Initialize the watcher.
+
+        :param Env env: ``Env`` whose environment and caches are updated.
+        :param env_file: Path of the file, or a list of layered files.
+        :param float interval: Seconds between two polls.
+        :param str backend: ``'poll'``, ``'inotify'``, or ``'auto'`` for
+            inotify where available.
+        :param bool overwrite: Apply changes to variables whose value does
+            not come from the files.
+        :param options: ``parse_comments``, ``encoding``, ``precedence`` and
+            ``interpolate``, as with :py:meth:`Env.read_env`.
+        """
+        if getattr(env, 'frozen', False):
+            raise TypeError(
+                'The environment of a frozen Env snapshot is read-only')
+        if backend not in ('auto', 'poll', 'inotify'):
+            raise ValueError(f'Unknown watcher backend: {backend!r}')
+        self._inotify = None if backend == 'poll' else _libc_inotify()
+        if backend == 'inotify' and self._inotify is None:
+            raise OSError('inotify is not available')
+
+        self.env = env
+        files = env_file if isinstance(env_file, (list, tuple)) else [env_file]
+        self.files = [os.path.abspath(os.fspath(path)) for path in files]
+        self.interval = interval
+        self.overwrite = overwrite
+        self.precedence = options.pop('precedence', 'last')
+        self.options = options
+        self._callbacks = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._wake = None
+
+        self._signatures = [None] * len(self.files)
+        self._parsed = [{}] * len(self.files)
+        self._values = {}
+        self._read_files(range(len(self.files)))
+        self._values = self._merge()
+
+    @property
+    def backend(self):
+        """The backend in use, ``'inotify'`` or ``'poll'``."""
+        return 'poll' if self._inotify is None else 'inotify'
+
+    def add_callback(self, callback):
+        """Call ``callback(changed)`` after changes are applied.
+
+        ``changed`` is the frozenset of the names of the variables that were
+        set or deleted. Exceptions raised by callbacks are logged.
+        """
+        self._callbacks.append(callback)
+        return callback
+
+    def check(self, force=()):
+        """Apply the changes of the files, if any, and return the names of
+        the changed variables.
+
+        Files are parsed again if their stat changed, or if they are listed
+        in ``force``.
+        """
+        with self._lock:
+            if not self._read_files(range(len(self.files)), force):
+                return frozenset()
+            changed = self._apply(self._merge())
+        if changed:
+            for callback in self._callbacks:
+                try:
+                    callback(changed)
+                # pylint: disable-next=broad-exception-caught
+                except Exception:  # noqa: B902
+                    logger.exception('Error in .env watcher callback')
+        return changed
+
+    def start(self):
+        """Watch the files in a daemon thread, and return the watcher."""
+        if self._thread is None:
+            # Changes are seen from now on, not once the thread is running.
+            inotify = self._watch() if self._inotify is not None else None
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, args=inotify or (), name='environ-watcher',
+                daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop watching, waiting for the thread to finish."""
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            if self._wake is not None:
+                os.write(self._wake[1], b'\0')
+            thread.join()
+            if self._wake is not None:
+                for fd in self._wake:
+                    os.close(fd)
+                self._wake = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _read_files(self, indexes, force=()):
+        """Parse the files which changed, and return whether any did."""
+        changed = False
+        for index in indexes:
+            path = self.files[index]
+            signature = _signature(path)
+            if signature is None or (
+                    signature == self._signatures[index]
+                    and path not in force):
+                continue
+            try:
+                values = _parse_env_file(path, **self.options)
+            except OSError as exc:
+                logger.info('Could not read %s: %s', path, exc)
+                continue
+            self._signatures[index] = signature
+            if values != self._parsed[index]:
+                self._parsed[index] = values
+                changed = True
+        return changed
+
+    def _merge(self):
+        parsed = self._parsed
+        merged = {}
+        for values in parsed if self.precedence == 'last' else parsed[::-1]:
+            merged.update(values)
+        if self.options.get('interpolate'):
+            environ = self.env.ENVIRON
+            # References to variables set outside of the files resolve to
+            # their value in the environment.
+            external = () if self.overwrite else {
+                name for name in merged if name in environ
+                and environ[name] != self._values.get(name)}
+            merged = _interpolate(merged, environ, external)
+        return merged
+
+    def _apply(self, values):
+        """Apply the difference between the previous and new ``values``."""
+        previous, self._values = self._values, values
+        environ = self.env.ENVIRON
+        updates = {}
+        for key, value in values.items():
+            old = previous.get(key)
+            if value != old and (self.overwrite or key not in environ
+                                 or environ[key] == old):
+                updates[key] = value
+        removed = [key for key in previous.keys() - values.keys()
+                   if key in environ and environ[key] == previous[key]]
+
+        if isinstance(environ, VersionedMapping) and (updates or removed):
+            # Counted as a single change, once every variable is applied.
+            for key in removed:
+                del environ.env[key]
+            environ.update(updates)
+        else:
+            if updates:
+                environ.update(updates)
+            for key in removed:
+                del environ[key]
+        changed = frozenset(updates).union(removed)
+        if changed:
+            self.env.invalidate(*changed)
+            logger.debug('Applied changes of .env files: %s',
+                         ', '.join(sorted(changed)))
+        return changed
+
+    def _watch(self):
+        """Return an inotify descriptor watching the files, and the
+        directories of its watches, or None if inotify failed."""
+        import ctypes  # pylint: disable=import-outside-toplevel
+        init, add_watch = self._inotify
+        fd = init(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            logger.warning('inotify_init1 failed: %s',
+                           os.strerror(ctypes.get_errno()))
+            self._inotify = None
+            return None
+        # Directories are watched, to see files replaced by a rename.
+        directories = {}
+        for directory in {os.path.dirname(path) for path in self.files}:
+            wd = add_watch(fd, os.fsencode(directory), _IN_EVENTS)
+            if wd >= 0:
+                directories[wd] = directory
+        # stop() writes to this pipe to interrupt the wait for events.
+        self._wake = os.pipe()
+        return fd, directories
+
+    def _run(self, fd=None, directories=None):
+        if fd is None:
+            while not self._stop.wait(self.interval):
+                self._safe_check()
+            return
+        import select  # pylint: disable=import-outside-toplevel
+        try:
+            while not self._stop.is_set():
+                ready, _, _ = select.select(
+                    [fd, self._wake[0]], [], [], self.interval)
+                if self._stop.is_set():
+                    break
+                force = self._read_events(fd, directories) if ready else ()
+                self._safe_check(force)
+        finally:
+            os.close(fd)
+
+    def _read_events(self, fd, directories):
+        """Return the watched files named by the pending inotify events."""
+        import struct  # pylint: disable=import-outside-toplevel
+        try:
+            data = os.read(fd, 1 << 16)
+        except BlockingIOError:
+            return set()
+        paths = set()
+        offset = 0
+        while offset < len(data):
+            wd, _, _, length = struct.unpack_from(_IN_EVENT, data, offset)
+            offset += struct.calcsize(_IN_EVENT)
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if wd in directories:
+                paths.add(os.path.join(directories[wd], os.fsdecode(name)))
+        return paths.intersection(self.files)
+
+    def _safe_check(self, force=()):
+        try:
+            self.check(force)
+        # pylint: disable-next=broad-exception-caught
+        except Exception:  # noqa: B902
+            logger.exception('Error applying changes of .env files')
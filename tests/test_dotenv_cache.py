@@ -0,0 +1,135 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+import io
+import os
+
+import pytest
+
+from environ import Env
+from environ.dotenv_cache import DotenvCache, default_directory
+
+# A modification time old enough for the stat of a file to be trusted.
+OLD = 1_600_000_000 * 10 ** 9
+
+
+class Parser:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, chunks):
+        self.calls += 1
+        return dict(line.split('=', 1) for line in ''.join(chunks).split())
+
+
+@pytest.fixture
+def env_file(tmp_path):
+    path = tmp_path / '.env'
+    path.write_text('A=1\nB=2\n')
+    os.utime(path, ns=(OLD, OLD))
+    return path
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DotenvCache(tmp_path / 'cache')
+
+
+def test_reused_while_stat_matches(env_file, cache):
+    parse = Parser()
+    assert cache.load(env_file, (), parse) == {'A': '1', 'B': '2'}
+    assert cache.load(str(env_file), (), parse) == {'A': '1', 'B': '2'}
+    assert parse.calls == 1
+
+
+def test_parsed_again_when_changed(env_file, cache):
+    parse = Parser()
+    cache.load(env_file, (), parse)
+    env_file.write_text('A=3\n')
+    assert cache.load(env_file, (), parse) == {'A': '3'}
+    assert parse.calls == 2
+
+
+def test_content_hash_when_only_stat_changed(env_file, cache):
+    parse = Parser()
+    cache.load(env_file, (), parse)
+    os.utime(env_file, ns=(OLD + 1, OLD + 1))
+    assert cache.load(env_file, (), parse) == {'A': '1', 'B': '2'}
+    assert parse.calls == 1
+
+
+def test_recent_files_are_checked_by_content(env_file, cache):
+    parse = Parser()
+    env_file.write_text('A=1\n')
+    cache.load(env_file, (), parse)
+    # Same size and modification time, different content.
+    stat = env_file.stat()
+    env_file.write_text('A=2\n')
+    os.utime(env_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.load(env_file, (), parse) == {'A': '2'}
+
+
+def test_keyed_by_options(env_file, cache):
+    parse = Parser()
+    cache.load(env_file, (False,), parse)
+    cache.load(env_file, (True,), parse)
+    cache.load(env_file, (False,), parse)
+    assert parse.calls == 2
+
+
+def test_invalid_entry_ignored(env_file, cache):
+    parse = Parser()
+    cache.load(env_file, (), parse)
+    entries = os.listdir(cache.directory)
+    assert len(entries) == 1 and entries[0].endswith('.marshal')
+    with open(os.path.join(cache.directory, entries[0]), 'wb') as f:
+        f.write(b'\x00garbage')
+    assert cache.load(env_file, (), parse) == {'A': '1', 'B': '2'}
+    assert parse.calls == 2
+
+
+def test_unwritable_directory(env_file, tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    cache = DotenvCache(blocker / 'cache')
+    assert cache.load(env_file, (), Parser()) == {'A': '1', 'B': '2'}
+
+
+def test_missing_file(tmp_path, cache):
+    with pytest.raises(OSError):
+        cache.load(tmp_path / 'missing.env', (), Parser())
+
+
+def test_default_directory(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert default_directory() == str(tmp_path / 'django-environ')
+    assert DotenvCache().directory == default_directory()
+
+
+class TestReadEnv:
+
+    @pytest.mark.parametrize('parse_comments', [True, False])
+    def test_same_as_uncached(self, tmp_path, parse_comments):
+        env_file = tmp_path / '.env'
+        env_file.write_text(
+            "A=1\nB='two' # note\nexport C=\"x\\ny\"\nA=4\n# comment\n")
+        expected, cached = Env(environ={}), Env(environ={'B': 'kept'})
+        expected.ENVIRON['B'] = 'kept'
+        expected.read_env(env_file, parse_comments=parse_comments, D='kw')
+        for _ in range(2):
+            cached.ENVIRON = {'B': 'kept'}
+            cached.read_env(env_file, parse_comments=parse_comments,
+                            cache=tmp_path / 'cache', D='kw')
+            assert cached.ENVIRON == expected.ENVIRON
+
+    def test_cache_not_used_for_file_objects(self, tmp_path):
+        env = Env(environ={})
+        env.read_env(io.StringIO('A=1'), cache=tmp_path / 'cache')
+        assert env.ENVIRON == {'A': '1'}
+        assert not (tmp_path / 'cache').exists()
@@ -8,7 +8,11 @@
 # the LICENSE.txt file that was distributed with this source code.
 
 import os
+import pickle
+import random
+import re
 import tempfile
+import threading
 from unittest import mock
 import logging
 import io
@@ -17,7 +21,16 @@ from urllib.parse import quote
 
 import pytest
 
-from environ import DefaultValueWarning, Env, Path
+from environ import (
+    DefaultValueWarning,
+    Env,
+    FileAwareEnv,
+    FileAwareMapping,
+    Path,
+    VersionedMapping,
+)
+from environ.environ import (
+    _PARSER_FACTORIES, _tokenize_env)
 from environ.compat import (
     DJANGO_POSTGRES,
     ImproperlyConfigured,
@@ -80,6 +93,67 @@ def test_parse_comments(variable, value, raw_value, parse_comments):
     os.environ = old_environ
 
 
+def line_by_line(content, parse_comments):
+    """The regex-per-line parser read_env used before the tokenizer."""
+    def keep_escaped(match):
+        char = match.group(1)
+        return '\\' + char if char in 'rnt' else char
+
+    values, invalid = [], []
+    for line in content.splitlines():
+        m1 = re.match(r'\A(?:export )?([A-Za-z_0-9]+)=(.*)\Z', line)
+        if m1:
+            key, val = m1.group(1), m1.group(2)
+            if not parse_comments:
+                m2 = re.match(r"\A'(.*)'\Z", val)
+                if m2:
+                    val = m2.group(1)
+            else:
+                m2 = re.match(r"\A\s*'(?<!\\)(.*)'\s*(#.*\s*)?\Z", val)
+                if m2:
+                    val = m2.group(1)
+                else:
+                    val = re.match(r"\A(.*?)(#.*\s*)?\Z", val).group(1)
+            m3 = re.match(r'\A"(.*)"\Z', val)
+            if m3:
+                val = re.sub(r'\\(.)', keep_escaped, m3.group(1))
+            values.append((key, val))
+        elif line and not line.startswith('#'):
+            invalid.append(line)
+    return values, invalid
+
+
+@pytest.mark.parametrize('parse_comments', [True, False])
+def test_tokenizer_matches_line_parser(parse_comments, caplog):
+    pieces = [
+        'KEY', 'export ', '=', "'", '"', '\\', '#', ' ', 'a', 'n', '$',
+        '\n', '\r\n', '\r', '\x0b', '\x0c', '\x1c', '\x85', '\u2028',
+    ]
+    rng = random.Random(18)
+    for _ in range(3000):
+        content = ''.join(rng.choice(pieces)
+                          for _ in range(rng.randrange(20)))
+        # The content read in chunks split anywhere.
+        cuts = sorted(rng.randrange(len(content) + 1) for _ in range(3))
+        chunks = [content[i:j] for i, j in zip([0] + cuts, cuts + [None])]
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger='environ.environ'):
+            values = [(key, value) for key, value, _, _
+                      in _tokenize_env(chunks, parse_comments)]
+        invalid = [record.args[0] for record in caplog.records]
+        assert (values, invalid) == line_by_line(content, parse_comments), \
+            repr(content)
+
+
+def test_tokenizer_quotes_and_lines():
+    content = 'A=1\n\n# comment\nB=\'two\'\r\nexport C="three"\n'
+    assert list(_tokenize_env([content])) == [
+        ('A', '1', '', 1),
+        ('B', 'two', "'", 4),
+        ('C', 'three', '"', 5),
+    ]
+
+
 class TestEnv:
     def setup_method(self, method):
         """
@@ -188,6 +262,26 @@ class TestEnv:
         assert_type_and_value(float, value, self.env.float(variable))
         assert_type_and_value(float, value, self.env(variable, cast=float))
 
+    def test_float_strict(self):
+        assert_type_and_value(
+            float, 33.3, self.env.float('FLOAT_VAR', strict=True))
+        assert_type_and_value(
+            float, -1.0, self.env.float('FLOAT_NEGATIVE_VAR', strict=True))
+        with pytest.raises(ValueError):
+            self.env.float('FLOAT_COMMA_VAR', strict=True)
+
+    @pytest.mark.parametrize(
+        'value,expected',
+        [
+            ('1e3', 1000.0),
+            (' 2.5 ', 2.5),
+            ('1_000.5', 1000.5),
+            ('EUR 1.000,5', 1000.5),
+        ]
+    )
+    def test_parse_float(self, value, expected):
+        assert_type_and_value(float, expected, Env.parse_value(value, float))
+
     @pytest.mark.parametrize(
         'value,variable',
         [
@@ -491,6 +585,26 @@ class TestEnv:
         assert any("not found - if you're not configuring your " in message
                    for message in caplog.messages)
 
+    @pytest.mark.parametrize('options', [
+        {}, {'cache': True}, {'interpolate': True}])
+    def test_read_env_missing_file_ignores_overrides(self, tmp_path,
+                                                     options):
+        if 'cache' in options:
+            options['cache'] = tmp_path / 'cache'
+        env = Env(environ={})
+        env.read_env(tmp_path / 'missing.env', FOO='bar', **options)
+        assert env.ENVIRON == {}
+
+    def test_read_env_decode_error_applies_nothing(self, tmp_path):
+        env_file = tmp_path / '.env'
+        env_file.write_bytes(
+            b''.join(b'VAR_%d=value\n' % i for i in range(20000))
+            + b'BAD=\xff\n')
+        env = Env(environ={})
+        with pytest.raises(UnicodeDecodeError):
+            env.read_env(env_file)
+        assert env.ENVIRON == {}
+
     def test_read_env_invalid_line_warns(self, caplog):
         with tempfile.TemporaryDirectory() as temp_dir:
             env_path = os.path.join(temp_dir, '.env')
@@ -503,6 +617,809 @@ class TestEnv:
         assert any('Invalid line: INVALID LINE' in message
                    for message in caplog.messages)
 
+    def test_read_env_last_assignment_wins(self):
+        env_cls = type(self.env)
+        env_cls.ENVIRON = {'EXISTING': 'kept'}
+        self.env.read_env(
+            io.StringIO('TWICE=one\nEXISTING=file\nTWICE=two\n'),
+            TWICE='kwarg', FROM_KWARG=1)
+        assert env_cls.ENVIRON == {
+            'EXISTING': 'kept', 'TWICE': 'two', 'FROM_KWARG': '1'}
+
+    def test_read_env_from_file_descriptor(self):
+        env_cls = type(self.env)
+        env_cls.ENVIRON = {}
+        read_fd, write_fd = os.pipe()
+        with os.fdopen(write_fd, 'w') as f:
+            f.write('FROM_PIPE=secret\n')
+        try:
+            self.env.read_env(read_fd)
+        finally:
+            os.close(read_fd)
+        assert env_cls.ENVIRON == {'FROM_PIPE': 'secret'}
+
+    def test_iter_env(self, tmp_path):
+        env_file = tmp_path / '.env'
+        env_file.write_text("A=1\n# comment\nB='two'  # note\nA=3")
+        assert list(Env.iter_env(env_file)) == [
+            ('A', '1', 1), ('B', "'two'  # note", 3), ('A', '3', 4)]
+        assert list(Env.iter_env(str(env_file), parse_comments=True)) == [
+            ('A', '1', 1), ('B', 'two', 3), ('A', '3', 4)]
+
+    def test_iter_env_lines(self):
+        lines = ['A=1', '', "B='two'\n", 'C=3']
+        assert list(Env.iter_env(lines)) == [
+            ('A', '1', 1), ('B', 'two', 3), ('C', '3', 4)]
+
+    def test_iter_env_reads_in_blocks(self, monkeypatch):
+        monkeypatch.setattr('environ.environ._ENV_READ_SIZE', 7)
+        content = ''.join(f'KEY_{i}=value {i}\r\n' for i in range(50))
+        assert list(Env.iter_env(io.StringIO(content, newline=''))) == [
+            (f'KEY_{i}', f'value {i}', i + 1) for i in range(50)]
+
+
+class TestParsers:
+    def test_parsers_are_cached_by_structure(self):
+        assert Env._get_parser([int]) is Env._get_parser([int])
+        assert Env._get_parser(dict(value=int, cast=dict(b=[float]))) is \
+            Env._get_parser(dict(cast=dict(b=[float]), value=int))
+        assert Env._get_parser([int]) is not Env._get_parser((int,))
+        assert Env._get_parser(int) is int
+
+    def test_subclass_boolean_strings(self):
+        class MyEnv(Env):
+            BOOLEAN_TRUE_STRINGS = frozenset(('si',))
+
+        assert MyEnv.parse_value('si', bool) is True
+        assert Env.parse_value('si', bool) is False
+        assert MyEnv.parse_value('yes', bool) is False
+
+    def test_register_parser(self):
+        class Celsius(float):
+            pass
+
+        Env.register_parser(Celsius, lambda value: Celsius(value.rstrip('C')))
+        try:
+            assert Env.parse_value('21.5C', Celsius) == 21.5
+            assert Env.parse_value('a=20C;b=1', dict(
+                value=int, cast=dict(a=Celsius))) == {'a': 20.0, 'b': 1}
+        finally:
+            del _PARSER_FACTORIES[Celsius]
+
+
+class TestProxy:
+    def setup_method(self, method):
+        self.old_environ = os.environ
+        os.environ = Env.ENVIRON = {
+            'BASE': '42',
+            'ALIAS_1': '$BASE',
+            'ALIAS_2': '$ALIAS_1',
+            'CYCLE_A': '$CYCLE_B',
+            'CYCLE_B': '$CYCLE_C',
+            'CYCLE_C': '$CYCLE_A',
+            'DANGLING': '$NOT_PRESENT',
+        }
+        self.env = Env()
+
+    def teardown_method(self, method):
+        os.environ = Env.ENVIRON = self.old_environ
+
+    def test_chain(self):
+        assert self.env('ALIAS_2') == '42'
+        assert self.env.int('ALIAS_2') == 42
+        assert self.env.list('ALIAS_2', cast=int) == [42]
+
+    def test_long_chain(self):
+        for i in range(2000):
+            Env.ENVIRON[f'HOP_{i}'] = f'$HOP_{i + 1}'
+        Env.ENVIRON['HOP_2000'] = 'end'
+        assert self.env('HOP_0') == 'end'
+
+    def test_cycle(self):
+        with pytest.raises(ImproperlyConfigured) as excinfo:
+            self.env('CYCLE_A')
+        assert str(excinfo.value) == (
+            'Proxied value of CYCLE_A is circular: '
+            'CYCLE_A -> CYCLE_B -> CYCLE_C -> CYCLE_A'
+        )
+
+    def test_missing_target(self):
+        with pytest.raises(ImproperlyConfigured) as excinfo:
+            self.env('DANGLING')
+        assert str(excinfo.value) == 'Set the NOT_PRESENT environment variable'
+        assert self.env.int('DANGLING', default=7) == 7
+
+    def test_prefixed_target(self):
+        Env.ENVIRON.update(APP_URL='$HOST', APP_HOST='example.com')
+        self.env.prefix = 'APP_'
+        assert self.env('URL') == 'example.com'
+
+    def test_resolution_pass_memoizes_targets(self):
+        reads = []
+
+        class RecordingEnviron(dict):
+            def __getitem__(self, key):
+                reads.append(key)
+                return super().__getitem__(key)
+
+        Env.ENVIRON = RecordingEnviron(Env.ENVIRON)
+        with self.env.resolution_pass():
+            assert self.env('ALIAS_2') == '42'
+            assert self.env('ALIAS_1') == '42'
+            assert self.env('ALIAS_2') == '42'
+        assert reads == ['ALIAS_2', 'ALIAS_1', 'BASE', 'ALIAS_1', 'ALIAS_2']
+
+        with self.env.resolution_pass():
+            Env.ENVIRON['BASE'] = '43'
+            assert self.env('ALIAS_2') == '43'
+
+    def test_resolution_pass_does_not_memoize_defaults(self):
+        with self.env.resolution_pass():
+            assert self.env('DANGLING', default='a') == 'a'
+            assert self.env('DANGLING', default='b') == 'b'
+
+    def test_target_scheme(self):
+        Env.ENVIRON.update(A='$B', B='5', D='$C')
+        env = Env(B=int, C=(str, 'fallback'))
+        for _ in range(2):
+            with env.resolution_pass():
+                assert env('A') == 5
+                assert env('A') == 5
+                assert env('D') == 'fallback'
+        assert env.str('A') == '5'
+
+    def test_overlapping_resolution_passes(self):
+        first, second = self.env.resolution_pass(), self.env.resolution_pass()
+        first.__enter__()
+        second.__enter__()
+        assert self.env('ALIAS_1') == '42'
+        first.__exit__(None, None, None)
+        second.__exit__(None, None, None)
+        Env.ENVIRON['BASE'] = '43'
+        assert self.env('ALIAS_1') == '43'
+
+    def test_resolution_pass_is_local_to_thread(self):
+        entered, done = threading.Event(), threading.Event()
+
+        def resolve():
+            with self.env.resolution_pass():
+                assert self.env('ALIAS_1') == '42'
+                entered.set()
+                done.wait(10)
+
+        thread = threading.Thread(target=resolve)
+        thread.start()
+        entered.wait(10)
+        Env.ENVIRON['BASE'] = '43'
+        assert self.env('ALIAS_1') == '43'
+        done.set()
+        thread.join()
+
+
+class TestValueCache:
+    def setup_method(self, method):
+        self.old_environ = os.environ
+        os.environ = Env.ENVIRON = FakeEnv.generate_data()
+        self.env = Env()
+        self.env.cache_values = True
+
+    def teardown_method(self, method):
+        os.environ = Env.ENVIRON = self.old_environ
+
+    def test_disabled_by_default(self):
+        env = Env()
+        assert env('INT_VAR', cast=int) == 42
+        assert env.cache_info() == (0, 0, 0)
+
+    def test_hits_and_misses(self):
+        assert self.env('INT_VAR', cast=int) == 42
+        assert self.env('INT_VAR', cast=int) == 42
+        assert self.env('INT_VAR', cast=str) == '42'
+        info = self.env.cache_info()
+        assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+
+    def test_invalidated_when_raw_value_changes(self):
+        assert self.env.int('INT_VAR') == 42
+        Env.ENVIRON['INT_VAR'] = '43'
+        assert self.env.int('INT_VAR') == 43
+        assert self.env.cache_info().hits == 0
+
+    def test_distinguishes_defaults_by_type(self):
+        assert self.env('NOT_PRESENT', default=1) == 1
+        assert self.env('NOT_PRESENT', default=True) is True
+
+    def test_mutable_results_are_copied(self):
+        first = self.env.list('INT_LIST', int)
+        first.append(1)
+        assert self.env.list('INT_LIST', int) == [42, 33]
+
+        nested = self.env.json('JSON_VAR')
+        nested['one'] = 'changed'
+        assert self.env.json('JSON_VAR') == FakeEnv.JSON
+        assert self.env.cache_info().hits == 2
+
+    def test_nested_results_are_copied(self):
+        Env.ENVIRON['NESTED_JSON'] = '{"one": [1, {"two": 2}]}'
+        first = self.env.json('NESTED_JSON')
+        first['one'][1]['two'] = 'changed'
+        first['one'].append(3)
+        assert self.env.json('NESTED_JSON') == {'one': [1, {'two': 2}]}
+
+    def test_unhashable_default_is_not_cached(self):
+        assert self.env.list('NOT_PRESENT', default=[set()]) == [set()]
+        assert self.env.cache_info().currsize == 0
+
+    def test_proxied_value_follows_target(self):
+        assert self.env('PROXIED_VAR') == 'bar'
+        Env.ENVIRON['STR_VAR'] = 'baz'
+        assert self.env('PROXIED_VAR') == 'baz'
+
+    def test_warns_on_cached_default(self):
+        Env.ENVIRON = VersionedMapping(Env.ENVIRON)
+        self.env.warn_on_default = True
+        for _ in range(2):
+            with pytest.warns(DefaultValueWarning):
+                assert self.env('not_present', default=3) == 3
+        assert self.env.cache_info().hits == 1
+
+    def test_no_warning_once_set_to_default(self):
+        Env.ENVIRON = VersionedMapping(Env.ENVIRON)
+        self.env.warn_on_default = True
+        with pytest.warns(DefaultValueWarning):
+            assert self.env.str('X', default='x') == 'x'
+        Env.ENVIRON['X'] = 'x'
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            for _ in range(2):
+                assert self.env.str('X', default='x') == 'x'
+
+    def test_size_is_bounded(self):
+        for _ in range(3000):
+            assert self.env('STR_VAR', cast=lambda value: value.upper()) \
+                == 'BAR'
+        info = self.env.cache_info()
+        assert info.hits == 0
+        assert info.currsize <= 1024
+
+    def test_cache_clear(self):
+        self.env.int('INT_VAR')
+        self.env.int('INT_VAR')
+        self.env.cache_clear()
+        assert self.env.cache_info() == (0, 0, 0)
+
+
+class TestSnapshot:
+    def setup_method(self, method):
+        self.old_environ = os.environ
+        os.environ = Env.ENVIRON = FakeEnv.generate_data()
+        self.env = Env(INT_VAR=int).snapshot()
+
+    def teardown_method(self, method):
+        os.environ = Env.ENVIRON = self.old_environ
+
+    def test_lookups(self):
+        assert self.env('INT_VAR') == 42
+        assert self.env('PROXIED_VAR') == 'bar'
+        assert self.env.list('INT_LIST', int) == [42, 33]
+
+    def test_ignores_later_changes(self):
+        Env.ENVIRON['INT_VAR'] = '43'
+        del Env.ENVIRON['STR_VAR']
+        assert self.env('INT_VAR') == 42
+        assert self.env('PROXIED_VAR') == 'bar'
+
+    def test_caches_cast_results(self):
+        assert self.env('INT_VAR') == 42
+        assert self.env('INT_VAR') == 42
+        assert self.env.cache_info().hits == 1
+
+    def test_mutation_raises(self):
+        with pytest.raises(TypeError):
+            self.env.ENVIRON['INT_VAR'] = '43'
+        with pytest.raises(TypeError):
+            self.env.read_env(io.StringIO('INT_VAR=43\n'))
+        assert Env.ENVIRON['INT_VAR'] == '42'
+
+    def test_original_is_unchanged(self):
+        env = Env()
+        env.snapshot()
+        assert not env.frozen
+        assert env.ENVIRON is Env.ENVIRON
+
+
+class TestLayers:
+
+    @pytest.fixture
+    def layers(self, tmp_path):
+        paths = []
+        for name, content in (('.env', 'A=base\nB=base\nC=base\n'),
+                              ('.env.prod', 'B=prod\nC=prod\n'),
+                              ('.env.local', 'C=local\n')):
+            paths.append(tmp_path / name)
+            paths[-1].write_text(content)
+        return paths
+
+    def test_last_wins(self, layers):
+        env = Env(environ={})
+        env.read_env(layers)
+        assert env.ENVIRON == {'A': 'base', 'B': 'prod', 'C': 'local'}
+
+    def test_first_wins(self, layers):
+        env = Env(environ={})
+        env.read_env(layers, precedence='first')
+        assert env.ENVIRON == {'A': 'base', 'B': 'base', 'C': 'base'}
+
+    def test_existing_variables(self, layers):
+        env = Env(environ={'B': 'set', 'D': 'set'})
+        env.read_env(layers, D='kwarg', E='kwarg')
+        assert env.ENVIRON == {
+            'A': 'base', 'B': 'set', 'C': 'local', 'D': 'set', 'E': 'kwarg'}
+
+        env.read_env(tuple(layers), overwrite=True, C='kwarg', D='kwarg')
+        assert env.ENVIRON == {
+            'A': 'base', 'B': 'prod', 'C': 'local', 'D': 'kwarg',
+            'E': 'kwarg'}
+
+    def test_missing_layers_skipped(self, layers, tmp_path, caplog):
+        env = Env(environ={})
+        with caplog.at_level(logging.INFO, logger='environ.environ'):
+            env.read_env([layers[0], tmp_path / '.env.missing', layers[1]])
+        assert env.ENVIRON == {'A': 'base', 'B': 'prod', 'C': 'prod'}
+        assert any('.env.missing not found' in message
+                   for message in caplog.messages)
+
+    def test_all_layers_missing(self, tmp_path):
+        env = Env(environ={})
+        missing = [tmp_path / '.env.missing', tmp_path / '.env.local']
+        env.read_env(missing, FOO='bar')
+        assert env.ENVIRON == {}
+        assert env.parse_env(missing) == {}
+
+    def test_applied_at_once(self, layers):
+        env = Env(environ=VersionedMapping({}))
+        env.read_env(layers)
+        assert env.ENVIRON.generation == 1
+
+    def test_mixed_sources(self, layers):
+        env = Env(environ={})
+        env.read_env([layers[0], io.StringIO('A=stream\n')],
+                     precedence='last')
+        assert env.ENVIRON['A'] == 'stream'
+
+    def test_invalid_precedence(self, layers):
+        with pytest.raises(ValueError, match='precedence'):
+            Env(environ={}).read_env(layers, precedence='middle')
+
+
+class TestParseAndApply:
+
+    def test_parse_env(self, tmp_path):
+        env_file = tmp_path / '.env'
+        env_file.write_text('A=1\nB="two"\nA=3\n')
+        env = Env(environ={})
+        assert env.parse_env(env_file) == {'A': '3', 'B': 'two'}
+        assert Env.parse_env(io.StringIO('C=3')) == {'C': '3'}
+        assert env.ENVIRON == {}
+
+    def test_parse_env_layers(self, tmp_path):
+        (tmp_path / 'one').write_text('A=1\nB=1\n')
+        (tmp_path / 'two').write_text('B=2\n')
+        layers = [tmp_path / 'one', tmp_path / 'missing', tmp_path / 'two']
+        assert Env.parse_env(layers) == {'A': '1', 'B': '2'}
+        assert Env.parse_env(layers, precedence='first') == {
+            'A': '1', 'B': '1'}
+
+    def test_parse_env_missing_file(self, tmp_path):
+        with pytest.raises(OSError):
+            Env.parse_env(tmp_path / 'missing')
+
+    def test_apply(self):
+        env = Env(environ=VersionedMapping({'A': 'set'}))
+        assert env.apply({'A': 'new', 'B': 2}) == {'B': '2'}
+        assert dict(env.ENVIRON) == {'A': 'set', 'B': '2'}
+        assert env.ENVIRON.generation == 1
+
+        assert env.apply({'A': 'new'}, overwrite=True) == {'A': 'new'}
+        assert env('A') == 'new'
+        assert env.apply({'A': 'newer'}) == {}
+        assert env.ENVIRON.generation == 2
+
+    def test_apply_to_frozen_snapshot(self):
+        snapshot = Env(environ={}).snapshot()
+        with pytest.raises(TypeError, match='read-only'):
+            snapshot.apply({'A': '1'})
+
+
+class TestInterpolation:
+
+    def read(self, content, environ=None, **kwargs):
+        env = Env(environ=dict(environ or {}))
+        env.read_env(io.StringIO(content), interpolate=True, **kwargs)
+        return env.ENVIRON
+
+    def test_references(self):
+        assert self.read(
+            'URL=postgres://${USER}@${HOST}:${PORT:-5432}/db\n'
+            'HOST=localhost\n'
+            'USER=${NAME-app}\n'
+            'EMPTY=\n'
+            'FALLBACK=${EMPTY:-fallback}/${EMPTY-kept}/${MISSING}\n',
+        ) == {
+            'URL': 'postgres://app@localhost:5432/db',
+            'HOST': 'localhost',
+            'USER': 'app',
+            'EMPTY': '',
+            'FALLBACK': 'fallback//',
+        }
+
+    def test_quotes_and_escapes(self):
+        assert self.read(
+            'A=1\n'
+            'DOUBLE="${A} $$A $${A}"\n'
+            "SINGLE='${A} $$A'\n"
+            'PROXY=$A\n'
+            'PARTIAL=${A\n',
+        ) == {
+            'A': '1',
+            'DOUBLE': '1 $A ${A}',
+            'SINGLE': '${A} $$A',
+            'PROXY': '$A',
+            'PARTIAL': '${A',
+        }
+
+    def test_environment(self):
+        environ = {'HOST': 'db.internal', 'PORT': '6432'}
+        content = 'HOST=localhost\nURL=${HOST}:${PORT}\n'
+        assert self.read(content, environ)['URL'] == 'db.internal:6432'
+        assert self.read(content, environ, overwrite=True)['URL'] == \
+            'localhost:6432'
+
+    def test_long_chain(self):
+        content = ''.join(f'V{i}=${{V{i + 1}}}\n' for i in range(5000))
+        assert self.read(content + 'V5000=end\n')['V0'] == 'end'
+
+    def test_cycle(self):
+        with pytest.raises(ImproperlyConfigured) as excinfo:
+            self.read('A=${B}\nOK=1\nB=x${C:-}\nC=${A}\n')
+        assert str(excinfo.value) == (
+            'Circular reference in .env files: A (<StringIO>:1) -> '
+            'B (<StringIO>:3) -> C (<StringIO>:4) -> A (<StringIO>:1)')
+
+        with pytest.raises(ImproperlyConfigured, match=r'A \(<StringIO>:1\)'):
+            self.read('A=${B}\nB=${A}\n')
+
+    def test_self_reference(self):
+        content = 'PORT=${PORT:-5432}\nURL=db:${PORT}\n'
+        assert self.read(content) == {'PORT': '5432', 'URL': 'db:5432'}
+        assert self.read(content, {'PORT': '6432'}) == {
+            'PORT': '6432', 'URL': 'db:6432'}
+        assert self.read(content, {'PORT': '6432'}, overwrite=True) == {
+            'PORT': '6432', 'URL': 'db:6432'}
+        assert self.read('PATH=${PATH}:/app/bin\n', {'PATH': '/bin'},
+                         overwrite=True) == {'PATH': '/bin:/app/bin'}
+
+    def test_keyword_arguments(self):
+        content = 'URL=${BASE}/x\n'
+        assert self.read(content, BASE='kw') == {'BASE': 'kw', 'URL': 'kw/x'}
+        assert self.read(content, {'BASE': 'env'}, BASE='kw') == {
+            'BASE': 'env', 'URL': 'env/x'}
+        assert self.read(content, {'BASE': 'env'}, overwrite=True,
+                         BASE='kw') == {'BASE': 'kw', 'URL': 'kw/x'}
+        assert self.read(content, PORT=80) == {'PORT': '80', 'URL': '/x'}
+
+    def test_layers(self, tmp_path):
+        (tmp_path / '.env').write_text('HOST=localhost\nURL=http://${HOST}\n')
+        (tmp_path / '.env.local').write_text('HOST=example.com\n')
+        layers = [tmp_path / '.env', tmp_path / '.env.local']
+        assert Env.parse_env(layers, interpolate=True)['URL'] == \
+            'http://example.com'
+
+        (tmp_path / '.env.local').write_text('A=${B}\nB=${A}\n')
+        with pytest.raises(ImproperlyConfigured, match='.env.local:2'):
+            Env.parse_env(layers, interpolate=True)
+
+    def test_parse_env_reads_instance_environment(self):
+        env = Env(environ={'HOME': '/home/app'})
+        assert env.parse_env(
+            io.StringIO('CACHE=${HOME}/.cache'), interpolate=True) == {
+            'CACHE': '/home/app/.cache'}
+
+    def test_cache(self, tmp_path):
+        env_file = tmp_path / '.env'
+        env_file.write_text("A=1\nB=${A}\nC='${A}'\n")
+        for _ in range(2):
+            env = Env(environ={'A': '0'})
+            env.read_env(env_file, interpolate=True, cache=tmp_path / 'c')
+            assert env.ENVIRON == {'A': '0', 'B': '0', 'C': '${A}'}
+
+
+class TestSearch:
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        Env.clear_search_cache()
+        (tmp_path / '.env').write_text('OUTSIDE=1\n')
+        project = tmp_path / 'project'
+        (project / '.git').mkdir(parents=True)
+        (project / '.env').write_text('FOUND=project\n')
+        (project / 'app' / 'settings').mkdir(parents=True)
+        return project
+
+    def test_nearest_file(self, project):
+        start = project / 'app' / 'settings'
+        assert Env.find_env(start) == str(project / '.env')
+        (project / 'app' / '.env').write_text('FOUND=app\n')
+        assert Env.find_env(start) == str(project / '.env')
+        Env.clear_search_cache()
+        env = Env(environ={})
+        env.read_env(search=start)
+        assert env.ENVIRON == {'FOUND': 'app'}
+
+    def test_stops_at_marker(self, project, caplog):
+        (project / '.env').unlink()
+        env = Env(environ={})
+        with caplog.at_level(logging.INFO):
+            env.read_env('.env', search=project / 'app')
+        assert env.ENVIRON == {}
+        assert 'No .env found in' in caplog.text
+
+    def test_file_name(self, project):
+        (project / 'app' / '.env.test').write_text('FOUND=test\n')
+        env = Env(environ={})
+        env.read_env('.env.test', search=project / 'app' / 'settings')
+        assert env.ENVIRON == {'FOUND': 'test'}
+
+    def test_found_paths_are_memoized(self, project):
+        start = project / 'app' / 'settings'
+        assert Env.find_env(start) == str(project / '.env')
+        # Later searches do not touch the file system.
+        with mock.patch('os.path.exists', side_effect=AssertionError):
+            assert Env.find_env(start) == str(project / '.env')
+
+    def test_missing_files_are_searched_again(self, project):
+        start = project / 'app' / 'settings'
+        assert Env.find_env(start, '.env.test') is None
+        (project / '.env.test').write_text('FOUND=test\n')
+        assert Env.find_env(start, '.env.test') == str(project / '.env.test')
+
+    def test_starts_from_caller_directory(self, caplog):
+        env = Env(environ={})
+        with caplog.at_level(logging.INFO):
+            env.read_env('.env.missing', search=True)
+        assert os.path.dirname(__file__) in caplog.text
+
+
+class TestScan:
+    ENVIRON = {
+        'FEATURE_SEARCH': 'off',
+        'FEATURE_BETA': 'on',
+        'FEATURE': 'on',
+        'FEATURES_ALL': 'on',
+        'APP_FEATURE_LOCAL': 'on',
+        'APP_PORT': '8000',
+    }
+
+    @pytest.fixture(params=[dict, VersionedMapping])
+    def env(self, request):
+        env = Env()
+        env.ENVIRON = request.param(dict(self.ENVIRON))
+        return env
+
+    def test_scan(self, env):
+        assert env.scan('FEATURE_') == {
+            'FEATURE_BETA': 'on', 'FEATURE_SEARCH': 'off'}
+        assert list(env.scan('FEATURE_')) == ['FEATURE_BETA', 'FEATURE_SEARCH']
+        assert env.scan('MISSING_') == {}
+        assert len(env.scan()) == len(self.ENVIRON)
+
+    def test_cast(self, env):
+        env.ENVIRON['FEATURE_PROXIED'] = '$FEATURE'
+        assert env.scan('FEATURE_', cast=bool) == {
+            'FEATURE_BETA': True,
+            'FEATURE_PROXIED': True,
+            'FEATURE_SEARCH': False,
+        }
+
+    def test_env_prefix(self, env):
+        env.prefix = 'APP_'
+        assert env.scan() == {'FEATURE_LOCAL': 'on', 'PORT': '8000'}
+        assert env.scan('FEATURE_') == {'FEATURE_LOCAL': 'on'}
+
+    def test_sees_changes(self, env):
+        assert env.scan('FEATURE_')
+        env.ENVIRON['FEATURE_NEW'] = 'on'
+        del env.ENVIRON['FEATURE_BETA']
+        assert list(env.scan('FEATURE_')) == ['FEATURE_NEW', 'FEATURE_SEARCH']
+
+    def test_index_rebuilt_on_change_only(self):
+        env = Env()
+        env.ENVIRON = VersionedMapping(dict(self.ENVIRON))
+        env.scan('FEATURE_')
+        index = env._key_index
+        env.scan('APP_')
+        assert env._key_index is index
+
+        env.ENVIRON['FEATURE_NEW'] = 'on'
+        env.scan('FEATURE_')
+        assert env._key_index is not index
+
+    def test_snapshot(self, env):
+        snapshot = env.snapshot()
+        env.ENVIRON['FEATURE_NEW'] = 'on'
+        assert list(snapshot.scan('FEATURE_')) == [
+            'FEATURE_BETA', 'FEATURE_SEARCH']
+
+
+class TestNamespace:
+    def setup_method(self, method):
+        self.env = Env(REDIS_PORT=(int, 6379), REDIS_DB=int)
+        self.env.ENVIRON = {
+            'REDIS_HOST': 'localhost',
+            'REDIS_DB': '2',
+            'REDIS_CACHE_TTL': '60',
+            'PG_HOST': 'db',
+        }
+
+    def test_lookups(self):
+        redis = self.env.namespace('REDIS_')
+        assert redis.prefix == 'REDIS_'
+        assert self.env.prefix == ''
+        assert redis('HOST') == 'localhost'
+        assert redis('PORT') == 6379
+        assert redis('DB') == 2
+        assert redis.scan() == {
+            'CACHE_TTL': '60', 'DB': 2, 'HOST': 'localhost'}
+
+    def test_nested(self):
+        cache = self.env.namespace('REDIS_').namespace('CACHE_')
+        assert cache.prefix == 'REDIS_CACHE_'
+        assert cache.int('TTL') == 60
+
+    def test_shares_state(self):
+        self.env.cache_values = True
+        redis = self.env.namespace('REDIS_')
+        assert redis.ENVIRON is self.env.ENVIRON
+        assert redis.scheme is self.env.scheme
+        assert redis._accessors is self.env._accessors
+
+        assert redis('DB') == 2
+        assert self.env('REDIS_DB') == 2
+        assert self.env.cache_info().hits == 1
+
+    def test_keeps_class(self):
+        env = FileAwareEnv()
+        assert type(env.namespace('REDIS_')) is FileAwareEnv
+
+
+class TestInstanceEnviron:
+    def test_per_instance_mapping(self):
+        first = Env(environ={'PORT': '8000'}, PORT=int)
+        second = Env(environ={'PORT': '9000'}, PORT=int)
+        assert first('PORT') == 8000
+        assert second('PORT') == 9000
+        assert Env.ENVIRON is os.environ
+
+    def test_read_env(self, tmp_path):
+        env_file = tmp_path / '.env'
+        env_file.write_text('PORT=8000\n')
+        env = Env(environ={})
+        env.read_env(env_file)
+        assert env.ENVIRON == {'PORT': '8000'}
+        assert 'PORT' not in os.environ
+
+    def test_file_aware(self, tmp_path):
+        secret = tmp_path / 'secret'
+        secret.write_text('s3cr3t')
+        env = FileAwareEnv(environ={'SECRET_KEY_FILE': str(secret)})
+        assert isinstance(env.ENVIRON, FileAwareMapping)
+        assert env('SECRET_KEY') == 's3cr3t'
+
+        mapping = FileAwareMapping(env={})
+        assert FileAwareEnv(environ=mapping).ENVIRON is mapping
+
+    def test_with_environ(self):
+        base = Env(PORT=(int, 80))
+        base.cache_values = True
+        first = base.with_environ({'PORT': '8000'})
+        second = base.with_environ({})
+
+        assert first('PORT') == 8000
+        assert second('PORT') == 80
+        assert first._accessors is base._accessors is second._accessors
+        assert first.cache_info().currsize == 1
+        assert base.cache_info().currsize == 0
+
+    def test_with_environ_of_snapshot(self):
+        snapshot = Env(environ={'PORT': '8000'}).snapshot()
+        env = snapshot.with_environ({})
+        env.ENVIRON['PORT'] = '9000'
+        assert env.int('PORT') == 9000
+        assert snapshot.int('PORT') == 8000
+
+    def test_with_environ_file_aware(self):
+        env = FileAwareEnv().with_environ({'A': 'b'})
+        assert isinstance(env.ENVIRON, FileAwareMapping)
+        assert env('A') == 'b'
+
+
+class TestPickle:
+    def test_unpicklable_cache_entries_are_dropped(self):
+        env = Env(environ={'A': '1', 'B': '2'})
+        env.cache_values = True
+        assert env('A', cast=lambda value: int(value)) == 1
+        assert env.int('B') == 2
+
+        copy = pickle.loads(pickle.dumps(env))
+        assert copy.cache_info().currsize == 1
+        assert copy.int('B') == 2
+        assert copy.cache_info().hits == 1
+
+    def test_warmed_cache(self):
+        env = Env(environ={'INT_LIST': '1,2', 'PORT': '8000'}, PORT=int)
+        env.cache_values = True
+        assert env('PORT') == 8000
+        assert env.list('INT_LIST', cast=int) == [1, 2]
+        assert env.int('MISSING', default=3) == 3
+
+        copy = pickle.loads(pickle.dumps(env))
+        assert copy.ENVIRON == env.ENVIRON
+        with mock.patch.object(Env, 'parse_value') as parse_value:
+            assert copy('PORT') == 8000
+            assert copy.list('INT_LIST', cast=int) == [1, 2]
+            assert copy.int('MISSING', default=3) == 3
+        assert not parse_value.called
+        assert copy.cache_info() == (3, 0, 3)
+
+    def test_revalidated_after_unpickling(self):
+        env = Env(environ=VersionedMapping({'PORT': '8000'}))
+        env.cache_values = True
+        assert env.int('PORT') == 8000
+
+        copy = pickle.loads(pickle.dumps(env))
+        copy.ENVIRON.env['PORT'] = '9000'  # not counted by the mapping
+        assert copy.int('PORT') == 9000
+
+    def test_os_environ(self):
+        env = Env(environ=os.environ)
+        assert pickle.loads(pickle.dumps(env)).ENVIRON is os.environ
+        assert 'ENVIRON' not in vars(pickle.loads(pickle.dumps(Env())))
+
+    def test_notset_identity(self):
+        assert pickle.loads(pickle.dumps(Env.NOTSET)) is Env.NOTSET
+
+    def test_snapshot(self):
+        snapshot = Env(environ={'PORT': '8000'}).snapshot()
+        assert snapshot.int('PORT') == 8000
+
+        copy = pickle.loads(pickle.dumps(snapshot))
+        assert copy.frozen
+        assert copy.int('PORT') == 8000
+        assert copy.cache_info().hits == 1
+        with pytest.raises(TypeError):
+            copy.ENVIRON['PORT'] = '9000'
+
+    def test_file_aware(self, tmp_path):
+        secret = tmp_path / 'secret'
+        secret.write_text('s3cr3t')
+        env = FileAwareEnv(environ={'SECRET_KEY_FILE': str(secret)})
+        assert env('SECRET_KEY') == 's3cr3t'
+        secret.unlink()
+
+        assert pickle.loads(pickle.dumps(env))('SECRET_KEY') == 's3cr3t'
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires fork()')
+    def test_fork(self):
+        env = Env(environ={'PORT': '8000'})
+        env.cache_values = True
+        assert env.int('PORT') == 8000
+
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            hit = env.int('PORT') == 8000 and env.cache_info().hits == 1
+            os._exit(0 if hit else 1)
+        _, status = os.waitpid(pid, 0)
+        assert os.waitstatus_to_exitcode(status) == 0
+
 
 class TestFileEnv(TestEnv):
     def setup_method(self, method):
@@ -8,6 +8,7 @@
 # the LICENSE.txt file that was distributed with this source code.
 
 import os
+import pickle
 import tempfile
 from contextlib import contextmanager
 
@@ -188,3 +189,18 @@ class TestSetItem:
         with make_temp_file(text="cat") as new_tmp_f:
             env["ANIMAL_FILE"] = new_tmp_f
             assert env["ANIMAL"] == "cat"
+
+
+def test_pickle_keeps_cache(tmp_f):
+    env = environ.FileAwareMapping(env={"ANIMAL_FILE": tmp_f})
+    assert env["ANIMAL"] == "fish"
+    os.unlink(tmp_f)
+
+    copy = pickle.loads(pickle.dumps(env))
+    assert copy["ANIMAL"] == "fish"
+    assert copy.env == {"ANIMAL_FILE": tmp_f}
+
+
+def test_pickle_os_environ():
+    env = environ.FileAwareMapping()
+    assert pickle.loads(pickle.dumps(env)).env is os.environ
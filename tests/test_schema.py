@@ -8,8 +8,12 @@
 # the LICENSE.txt file that was distributed with this source code.
 
 import os
+from unittest import mock
+
+import pytest
 
 from environ import Env
+from environ.compat import ImproperlyConfigured
 from .fixtures import FakeEnv
 
 _old_environ = None
@@ -53,3 +57,119 @@ def test_schema():
     # Override schema in this one case
     assert isinstance(env('INT_VAR', cast=str), str)
     assert env('INT_VAR', cast=str) == '42'
+
+
+def test_schema_late_addition():
+    env = Env(INT_VAR=int)
+    env.scheme['FLOAT_VAR'] = float
+    assert env('FLOAT_VAR') == 33.3
+
+    env.scheme['INT_VAR'] = (str, 'x')
+    env.compile()
+    assert env('INT_VAR') == '42'
+
+    env.scheme = {'INT_VAR': [int]}
+    assert env('INT_LIST') == '42,33'
+    assert env('INT_VAR') == [42]
+
+
+def test_schema_parsers():
+    env = Env(INT_VAR=int, BOOL_TRUE_STRING_LIKE_BOOL=(None, False),
+              NOT_PRESENT_VAR=str)
+    assert env._accessors['BOOL_TRUE_STRING_LIKE_BOOL'].smart_cast is bool
+    with mock.patch.object(Env, 'parse_value', side_effect=AssertionError):
+        assert env('INT_VAR') == 42
+        assert env('BOOL_TRUE_STRING_LIKE_BOOL') is True
+        assert env('NOT_PRESENT_VAR', default=None) is None
+    env.smart_cast = False
+    assert env('BOOL_TRUE_STRING_LIKE_BOOL') == 'True'
+
+
+def test_schema_parsers_follow_registered_parsers():
+    class Flag(str):
+        pass
+
+    env = Env(STR_VAR=Flag)
+    assert env('STR_VAR') == 'bar'
+    Env.register_parser(Flag, str.upper)
+    try:
+        assert env('STR_VAR') == 'BAR'
+    finally:
+        Env.register_parser(Flag, Flag)
+    assert env('STR_VAR') == 'bar'
+
+
+def test_schema_overridden_parse_value():
+    class UpperEnv(Env):
+        @classmethod
+        def parse_value(cls, value, cast):
+            return super().parse_value(value, cast).upper()
+
+    env = UpperEnv(STR_VAR=str, BOOL_TRUE_STRING_LIKE_BOOL=(None, False))
+    assert env('STR_VAR') == 'BAR'
+    with pytest.raises(AttributeError):
+        env('BOOL_TRUE_STRING_LIKE_BOOL')  # bool has no upper()
+
+
+def test_schema_dict_cast_declaration():
+    env = Env(SAML_ATTRIBUTE_MAPPING={'key': str, 'value': tuple})
+    assert env('SAML_ATTRIBUTE_MAPPING') == {
+        'uid': ('username',),
+        'mail': ('email',),
+        'cn': ('first_name',),
+        'sn': ('last_name',),
+    }
+
+
+def test_load():
+    env = Env(INT_VAR=int, NOT_PRESENT_VAR=(float, 33.3))
+    assert env.load() == {'INT_VAR': 42, 'NOT_PRESENT_VAR': 33.3}
+    assert env.load({
+        'STR_VAR': str,
+        'INT_LIST': [int],
+        'PROXIED_VAR': None,
+        'INT_VAR': (str, 'x'),
+        'NOT_PRESENT2': (bool, False),
+    }) == {
+        'STR_VAR': 'bar',
+        'INT_LIST': [42, 33],
+        'PROXIED_VAR': 'bar',
+        'INT_VAR': '42',
+        'NOT_PRESENT2': False,
+    }
+
+
+def test_load_reports_all_errors():
+    env = Env()
+    with pytest.raises(ImproperlyConfigured) as excinfo:
+        env.load({
+            'INT_VAR': int,
+            'NOT_PRESENT': str,
+            'STR_VAR': int,
+            'ALSO_NOT_PRESENT': int,
+        })
+    assert str(excinfo.value) == (
+        '3 environment variable(s) are missing or invalid:\n'
+        '  NOT_PRESENT: Set the NOT_PRESENT environment variable\n'
+        "  STR_VAR: invalid literal for int() with base 10: 'bar'\n"
+        '  ALSO_NOT_PRESENT: Set the ALSO_NOT_PRESENT environment variable'
+    )
+    assert list(excinfo.value.errors) == [
+        'NOT_PRESENT', 'STR_VAR', 'ALSO_NOT_PRESENT']
+
+
+def test_load_prefixed_scheme():
+    env = Env(environ={'APP_PORT': '80', 'APP_DEBUG': 'x'},
+              APP_PORT=int, APP_DEBUG=bool, APP_MISSING=str, OTHER=str)
+    env.prefix = 'APP_'
+    assert env('PORT') == 80
+    assert env.load({'PORT': int}) == {'PORT': 80}
+    with pytest.raises(ImproperlyConfigured) as excinfo:
+        env.load()
+    assert str(excinfo.value) == (
+        '1 environment variable(s) are missing or invalid:\n'
+        '  APP_MISSING: Set the APP_MISSING environment variable'
+    )
+    assert list(excinfo.value.errors) == ['MISSING']
+    del env.scheme['APP_MISSING']
+    assert env.load() == {'PORT': 80, 'DEBUG': False}
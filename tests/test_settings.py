@@ -0,0 +1,201 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+import typing
+import warnings
+
+import pytest
+
+import environ
+from environ import DefaultValueWarning, Env
+from environ.compat import ImproperlyConfigured
+
+
+def make_env(environ_=None, **kwargs):
+    env = Env()
+    env.ENVIRON = dict(environ_ or {})
+    for name, value in kwargs.items():
+        setattr(env, name, value)
+    return env
+
+
+class AppSettings(environ.Settings):
+    DEBUG: bool = False
+    SECRET_KEY: str
+    PORT: int = 8000
+    ALLOWED_HOSTS: typing.List[str] = []
+    RATIO: float = None
+    TIMEOUT: float = environ.field(env='DB_TIMEOUT', default=5.0)
+    LIMITS: typing.Dict[str, int] = {}
+    _private: int = 1
+
+
+def test_load():
+    env = make_env({
+        'DEBUG': 'on',
+        'SECRET_KEY': 'secret',
+        'ALLOWED_HOSTS': 'a.example.com,b.example.com',
+        'RATIO': '',
+        'DB_TIMEOUT': '1.5',
+        'LIMITS': 'a=1;b=2',
+    })
+    settings = AppSettings.load(env)
+
+    assert isinstance(settings, AppSettings)
+    assert settings.DEBUG is True
+    assert settings.SECRET_KEY == 'secret'
+    assert settings.PORT == 8000
+    assert settings.ALLOWED_HOSTS == ['a.example.com', 'b.example.com']
+    assert settings.RATIO is None
+    assert settings.TIMEOUT == 1.5
+    assert settings.LIMITS == {'a': 1, 'b': 2}
+    assert repr(settings).startswith("AppSettings(DEBUG=True, ")
+
+
+def test_fields():
+    fields = AppSettings.fields()
+    assert list(fields) == [
+        'DEBUG', 'SECRET_KEY', 'PORT', 'ALLOWED_HOSTS', 'RATIO', 'TIMEOUT',
+        'LIMITS']
+    assert fields['ALLOWED_HOSTS'].cast == [str]
+    assert fields['LIMITS'].cast == {'value': int}
+    assert fields['TIMEOUT'].env == 'DB_TIMEOUT'
+    assert fields['SECRET_KEY'].default is Env.NOTSET
+
+
+def test_postponed_annotations():
+    class PostponedSettings(environ.Settings):
+        PORT: 'int' = 8000
+        HOSTS: typing.List['str'] = []
+
+    fields = PostponedSettings.fields()
+    assert fields['PORT'].cast is int
+    assert fields['HOSTS'].cast == [str]
+
+
+def test_inheritance():
+    class ProdSettings(AppSettings):
+        PORT = 443
+        WORKERS: int = 4
+
+    env = make_env({'SECRET_KEY': 'secret'})
+    settings = ProdSettings.load(env)
+    assert settings.PORT == 443
+    assert settings.WORKERS == 4
+
+
+def test_reports_all_errors():
+    env = make_env({'PORT': 'eighty', 'DB_TIMEOUT': '1.5'})
+    with pytest.raises(ImproperlyConfigured) as excinfo:
+        AppSettings.load(env)
+
+    assert set(excinfo.value.errors) == {'SECRET_KEY', 'PORT'}
+    assert str(excinfo.value).startswith(
+        '2 environment variable(s) are missing or invalid:')
+    assert 'Set the SECRET_KEY environment variable' in str(excinfo.value)
+
+
+def test_prefix():
+    env = make_env({'APP_SECRET_KEY': 'secret', 'APP_PORT': '80'},
+                   prefix='APP_')
+    settings = AppSettings.load(env)
+    assert settings.SECRET_KEY == 'secret'
+    assert settings.PORT == 80
+
+
+def test_loader_is_cached_per_options():
+    env = make_env()
+    assert AppSettings.compile(env) is AppSettings.compile(make_env())
+    assert AppSettings.compile(env) is not AppSettings.compile(
+        make_env(prefix='APP_'))
+
+
+def test_loader_survives_parser_cache_eviction():
+    env = make_env()
+    loader = AppSettings.compile(env)
+    for index in range(1100):
+        Env.parse_value(str(index), type(f'Cast{index}', (str,), {}))
+    assert AppSettings.compile(env) is loader
+
+
+def test_register_parser_rebuilds_loader():
+    class Flag:
+        def __init__(self, value):
+            self.value = value
+
+    class FlagSettings(environ.Settings):
+        FEATURE: Flag
+
+    env = make_env({'FEATURE': 'x'})
+    assert FlagSettings.load(env).FEATURE.value == 'x'
+
+    Env.register_parser(Flag, str.upper)
+    try:
+        assert FlagSettings.load(env).FEATURE == 'X'
+    finally:
+        Env.register_parser(Flag, Flag)
+
+
+def test_warn_on_default():
+    env = make_env({'SECRET_KEY': 'secret'}, warn_on_default=True)
+    with pytest.warns(DefaultValueWarning) as record:
+        AppSettings.load(env)
+    assert [str(warning.message).split()[0] for warning in record] == [
+        'DEBUG', 'PORT', 'ALLOWED_HOSTS', 'RATIO', 'DB_TIMEOUT', 'LIMITS']
+    assert {warning.filename for warning in record} == {__file__}
+
+
+def test_unsupported_annotation():
+    class BadSettings(environ.Settings):
+        VALUE: typing.Union[int, str]
+
+    with pytest.raises(TypeError, match='Unsupported settings annotation'):
+        BadSettings.load(make_env({'VALUE': '1'}))
+
+
+@pytest.mark.parametrize('smart_cast', [True, False])
+@pytest.mark.parametrize('escape_proxy', [True, False])
+@pytest.mark.parametrize('cast,default,parse_default', [
+    (str, Env.NOTSET, False),
+    (int, Env.NOTSET, False),
+    (bool, False, False),
+    (None, 10, False),
+    (None, None, False),
+    (str, None, False),
+    (str, 'on', False),
+    (bool, 'on', True),
+    ([int], '1,2', True),
+    (None, '$OTHER', False),
+    (str, r'\$escaped', False),
+    ((int,), (), False),
+    ({'value': int}, {}, False),
+])
+@pytest.mark.parametrize('raw', [
+    None, '', 'on', '42', '1,2', '$OTHER', r'\$escaped', 'a=1'])
+def test_matches_get_value(raw, cast, default, parse_default, smart_cast,
+                           escape_proxy):
+    environ_ = {'OTHER': '7'}
+    if raw is not None:
+        environ_['VALUE'] = raw
+    env = make_env(environ_, smart_cast=smart_cast, escape_proxy=escape_proxy)
+
+    class OneSetting(environ.Settings):
+        VALUE = environ.field(cast, default, parse_default=parse_default)
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            expected = env.get_value('VALUE', cast, default, parse_default)
+    except (ImproperlyConfigured, LookupError, TypeError, ValueError) as exc:
+        with pytest.raises(ImproperlyConfigured) as excinfo:
+            OneSetting.load(env)
+        assert type(excinfo.value.errors['VALUE']) is type(exc)
+        assert str(excinfo.value.errors['VALUE']) == str(exc)
+    else:
+        assert OneSetting.load(env).VALUE == expected
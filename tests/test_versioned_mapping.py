@@ -0,0 +1,147 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+import io
+import os
+import pickle
+import tempfile
+
+import pytest
+
+import environ
+from environ.compat import ImproperlyConfigured
+
+
+def test_mapping():
+    env = environ.VersionedMapping(env={"FRUIT": "apple"})
+    assert env["FRUIT"] == "apple"
+    assert "FRUIT" in env
+    assert env.get("VEGETABLE") is None
+    assert list(env) == ["FRUIT"]
+    assert len(env) == 1
+    assert env.generation == 0
+
+
+def test_defaults_to_os_environ():
+    assert environ.VersionedMapping().env is os.environ
+
+
+def test_generation():
+    data = {}
+    env = environ.VersionedMapping(env=data)
+    env["FRUIT"] = "apple"
+    assert env.generation == 1
+    env.update(VEGETABLE="leek", ANIMAL="cat")
+    assert env.generation == 2
+    del env["ANIMAL"]
+    assert env.generation == 3
+    assert env.setdefault("FRUIT", "banana") == "apple"
+    assert env.generation == 3
+    assert data == {"FRUIT": "apple", "VEGETABLE": "leek"}
+
+
+def test_read_env_bumps_generation():
+    env = environ.VersionedMapping(env={})
+
+    class MyEnv(environ.Env):
+        ENVIRON = env
+
+    MyEnv.read_env(io.StringIO("FRUIT=apple\n"))
+    assert env.generation == 1
+    assert env["FRUIT"] == "apple"
+
+
+def test_value_cache_skips_environ_reads():
+    reads = []
+
+    class RecordingDict(dict):
+        def __getitem__(self, key):
+            reads.append(key)
+            return super().__getitem__(key)
+
+    class MyEnv(environ.Env):
+        ENVIRON = environ.VersionedMapping(RecordingDict(PORT="8000"))
+
+    env = MyEnv()
+    env.cache_values = True
+    assert env.int("PORT") == 8000
+    assert env.int("PORT") == 8000
+    assert reads == ["PORT"]
+
+    MyEnv.ENVIRON["PORT"] = "8080"
+    assert env.int("PORT") == 8080
+    assert env.cache_info().hits == 1
+
+
+def test_fileaware_cache_follows_generation():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        fish = os.path.join(temp_dir, "fish")
+        cat = os.path.join(temp_dir, "cat")
+        for path in (fish, cat):
+            with open(path, "w") as f:
+                f.write(os.path.basename(path))
+
+        versioned = environ.VersionedMapping(env={"ANIMAL_FILE": fish})
+        env = environ.FileAwareMapping(env=versioned)
+        assert env.generation == 0
+        assert env["ANIMAL"] == "fish"
+
+        versioned.env["ANIMAL_FILE"] = cat
+        assert env["ANIMAL"] == "fish"
+        versioned["UNRELATED"] = "change"
+        assert env["ANIMAL"] == "cat"
+        assert env.generation == 1
+
+        assert environ.FileAwareMapping(env=versioned, cache=False) \
+            .generation is None
+
+
+def test_missing_variables_are_remembered():
+    reads = []
+
+    class RecordingDict(dict):
+        def __getitem__(self, key):
+            reads.append(key)
+            return super().__getitem__(key)
+
+    class MyEnv(environ.Env):
+        ENVIRON = environ.VersionedMapping(RecordingDict())
+
+    env = MyEnv()
+    assert env.int("WORKERS", default=4) == 4
+    assert env.int("WORKERS", default=4) == 4
+    assert env.bool("DEBUG", default=False) is False
+    assert reads == ["WORKERS", "DEBUG"]
+
+    env.read_env(io.StringIO("WORKERS=8\n"))
+    assert env.int("WORKERS", default=4) == 8
+
+    MyEnv.ENVIRON["DEBUG"] = "on"
+    assert env.bool("DEBUG", default=False) is True
+
+
+def test_missing_required_variable_still_raises():
+    class MyEnv(environ.Env):
+        ENVIRON = environ.VersionedMapping({})
+
+    env = MyEnv()
+    assert env("SECRET_KEY", default=None) is None
+    with pytest.raises(ImproperlyConfigured) as excinfo:
+        env("SECRET_KEY")
+    assert excinfo.value.__cause__ is not None
+
+
+def test_pickle():
+    env = environ.VersionedMapping(env={"FRUIT": "apple"})
+    env["FRUIT"] = "pear"
+    copy = pickle.loads(pickle.dumps(env))
+    assert copy.env == {"FRUIT": "pear"}
+    assert copy.generation == 1
+    assert pickle.loads(
+        pickle.dumps(environ.VersionedMapping())).env is os.environ
@@ -0,0 +1,170 @@
+# This file is part of the django-environ.
+#
+# Copyright (c) 2024-present, Daniele Faraglia <daniele.faraglia@gmail.com>
+# Copyright (c) 2021-2024, Serghei Iakovlev <oss@serghei.pl>
+# Copyright (c) 2013-2021, Daniele Faraglia <daniele.faraglia@gmail.com>
+#
+# For the full copyright and license information, please view
+# the LICENSE.txt file that was distributed with this source code.
+
+import os
+import queue
+
+import pytest
+
+from environ import Env, EnvWatcher, VersionedMapping
+from environ.watcher import _libc_inotify
+
+
+def write(path, content):
+    # A new inode, as editors replacing the file do, so that the stat
+    # changes even within the resolution of modification times.
+    tmp = path.with_name(path.name + '.tmp')
+    tmp.write_text(content)
+    os.replace(tmp, path)
+
+
+@pytest.fixture
+def env_file(tmp_path):
+    path = tmp_path / '.env'
+    write(path, 'A=1\nB=2\nC=3\n')
+    return path
+
+
+@pytest.fixture
+def env(env_file):
+    env = Env(environ=VersionedMapping({}))
+    env.read_env(env_file)
+    return env
+
+
+def test_check_applies_diff(env, env_file):
+    watcher = EnvWatcher(env, env_file, backend='poll')
+    changes = []
+    watcher.add_callback(changes.append)
+    assert watcher.check() == frozenset()
+
+    write(env_file, 'A=1\nB=two\nD=4\n')
+    generation = env.ENVIRON.generation
+    assert watcher.check() == {'B', 'C', 'D'}
+    assert dict(env.ENVIRON) == {'A': '1', 'B': 'two', 'D': '4'}
+    assert changes == [{'B', 'C', 'D'}]
+    # The whole difference counts as a single change.
+    assert env.ENVIRON.generation == generation + 1
+
+
+def test_removals_counted_once_applied(env, env_file):
+    watcher = EnvWatcher(env, env_file, backend='poll')
+    env.cache_values = True
+    assert env.int('A') == 1
+
+    write(env_file, 'D=4\n')
+    generation = env.ENVIRON.generation
+    seen = []
+    environ = env.ENVIRON.env
+
+    class Recorder(dict):
+        def __delitem__(self, key):
+            # Cached values still come from the previous files.
+            seen.append((env.ENVIRON.generation, env.int('A')))
+            super().__delitem__(key)
+
+    env.ENVIRON.env = Recorder(environ)
+    assert watcher.check() == {'A', 'B', 'C', 'D'}
+    assert seen == [(generation, 1)] * 3
+    assert dict(env.ENVIRON) == {'D': '4'}
+    assert env.ENVIRON.generation == generation + 1
+
+
+def test_invalidates_changed_variables(env, env_file):
+    watcher = EnvWatcher(env, env_file, backend='poll')
+    env.cache_values = True
+    b_value, a_value = env.lazy.int('B'), env.lazy.int('A')
+    assert b_value == 2 and a_value == 1
+    assert env.int('C') == 3
+
+    write(env_file, 'A=1\nB=20\nC=30\n')
+    watcher.check()
+    assert b_value == 20
+    assert env.int('C') == 30
+    assert env.dependents('A') == [a_value]
+
+
+def test_environment_precedence(env, env_file):
+    env.ENVIRON['B'] = 'from process'
+    watcher = EnvWatcher(env, env_file, backend='poll')
+    write(env_file, 'A=10\nB=20\n')
+    assert watcher.check() == {'A', 'C'}
+    assert dict(env.ENVIRON) == {'A': '10', 'B': 'from process'}
+
+    watcher = EnvWatcher(env, env_file, backend='poll', overwrite=True)
+    write(env_file, 'A=10\nB=200\n')
+    assert watcher.check() == {'B'}
+    assert env('B') == '200'
+
+
+def test_layers(env, env_file, tmp_path):
+    local = tmp_path / '.env.local'
+    watcher = EnvWatcher(env, [env_file, local], backend='poll')
+    write(local, 'B=local\n')
+    assert watcher.check() == {'B'}
+    assert env('B') == 'local'
+
+
+def test_missing_file_keeps_variables(env, env_file):
+    watcher = EnvWatcher(env, env_file, backend='poll')
+    env_file.unlink()
+    assert watcher.check() == frozenset()
+    assert env('A') == '1'
+
+
+def test_callback_errors_are_logged(env, env_file, caplog):
+    watcher = EnvWatcher(env, env_file, backend='poll')
+
+    @watcher.add_callback
+    def failing(changed):
+        raise RuntimeError('boom')
+
+    write(env_file, 'A=2\n')
+    assert 'A' in watcher.check()
+    assert 'Error in .env watcher callback' in caplog.text
+
+
+def test_frozen_snapshot(env, env_file):
+    with pytest.raises(TypeError, match='read-only'):
+        EnvWatcher(env.snapshot(), env_file)
+
+
+def test_unknown_backend(env, env_file):
+    with pytest.raises(ValueError, match='backend'):
+        EnvWatcher(env, env_file, backend='kqueue')
+
+
+@pytest.mark.parametrize('backend', [
+    'poll',
+    pytest.param('inotify', marks=pytest.mark.skipif(
+        _libc_inotify() is None, reason='inotify is not available')),
+])
+def test_thread(env, env_file, backend):
+    interval = 0.05 if backend == 'poll' else 60
+    changes = queue.Queue()
+    watcher = EnvWatcher(env, env_file, interval=interval, backend=backend)
+    watcher.add_callback(changes.put)
+    assert watcher.backend == backend
+
+    with watcher:
+        write(env_file, 'A=1\nB=2\nC=30\n')
+        assert changes.get(timeout=10) == {'C'}
+    assert env('C') == '30'
+
+
+def test_interpolate(tmp_path):
+    env_file = tmp_path / '.env'
+    write(env_file, 'HOST=localhost\nURL=http://${HOST}/\n')
+    env = Env(environ={'HOST': 'from-process'})
+    env.read_env(env_file, interpolate=True)
+    watcher = EnvWatcher(env, env_file, backend='poll', interpolate=True)
+
+    write(env_file, 'HOST=example.com\nURL=https://${HOST}/\n')
+    assert watcher.check() == {'URL'}
+    assert env('URL') == 'https://from-process/'